@@ -1,8 +1,6 @@
 import streamlit as st
-import os
-os.environ["STREAMLIT_THEME_BASE"] = "light"
-st.write("Theme base:", os.listdir("."))
-st.write("Streamlit config:", os.path.exists(".streamlit/config.toml"))
+
+from sdg.warmup import start_warmup
 
 
 # Configurações da página
@@ -12,6 +10,9 @@ st.set_page_config(
     layout="centered"
 )
 
+# Aquece dados e gráficos em segundo plano na primeira visita (SDG_WARMUP=1)
+start_warmup()
+
 # Título da página
 st.title("🌱 SDG Attributes")
 
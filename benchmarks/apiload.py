@@ -0,0 +1,148 @@
+# Vazão da API JSON (sdg.api) com clientes simultâneos: cada cliente mantém uma conexão
+# persistente e percorre uma lista de requisições das páginas. Três fases:
+#
+#   cold         primeira passada, respostas montadas a partir dos dados
+#   full         respostas completas (200) servidas do cache em memória
+#   conditional  requisições com If-None-Match, respondidas com 304
+#
+#     python -m benchmarks.apiload --clients 16 --requests 200
+#     python -m benchmarks.apiload --url http://127.0.0.1:8502   # servidor já em execução
+import argparse
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+from benchmarks.loadtest import PERCENTILES, summarize
+from sdg.attributes import load_attributes
+from sdg.data import load_dataset
+from sdg.views import tema_areas
+
+
+# Requisições que as páginas fariam: cada tema e área, estatísticas, atributos, vizinhos
+def request_paths():
+    dataset = load_dataset()
+    paths = ['/api/ports', '/api/temas', '/api/rankings', '/api/peers', '/api/statistics',
+             '/api/statistics?statistic=Median']
+    for tema in dataset.temas:
+        paths.append(f'/api/slice?tema={quote(tema)}')
+        paths.append(f'/api/media?tema={quote(tema)}')
+        paths.extend(f'/api/slice?tema={quote(tema)}&area={quote(area)}' for area in tema_areas(dataset, tema))
+    try:
+        attributes = load_attributes()
+        paths.extend(f'/api/attributes?category={quote(category)}' for category in attributes.groups.keys())
+    except (OSError, ValueError):
+        pass
+    paths.extend(f'/api/peers?port={quote(port)}' for port in dataset.ports[:20])
+    return paths
+
+
+def _client(host, port, paths, count, offset, etags=None):
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    samples, statuses, received = [], {}, 0
+    try:
+        for index in range(count):
+            path = paths[(offset + index) % len(paths)]
+            headers = {'Accept-Encoding': 'gzip'}
+            if etags is not None:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            samples.append(time.perf_counter() - start)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            received += len(body)
+    finally:
+        connection.close()
+    return samples, statuses, received
+
+
+def _etags(host, port, paths):
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    etags = {}
+    try:
+        for path in paths:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            etags[path] = response.getheader('ETag')
+    finally:
+        connection.close()
+    return etags
+
+
+def _phase(host, port, paths, clients, requests, etags=None):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda client: _client(host, port, paths, requests, client * 7, etags),
+                                    range(clients)))
+    elapsed = time.perf_counter() - started
+    samples = [sample for result, _, _ in results for sample in result]
+    statuses = {}
+    for _, counts, _ in results:
+        for status, total in counts.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + total
+    report = {'requests': len(samples), 'elapsed_s': elapsed, 'requests_per_s': len(samples) / elapsed,
+              'bytes': sum(received for _, _, received in results), 'statuses': statuses}
+    report.update(summarize(samples))
+    return report
+
+
+def api_load(clients, requests, url=None):
+    server = None
+    if url is None:
+        from sdg.api import Api, start_server
+
+        server = start_server(api=Api())
+        host, port = server.server_address[0], server.server_port
+    else:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+    paths = request_paths()
+    try:
+        report = {'clients': clients, 'paths': len(paths)}
+        # Uma passada completa pelas requisições, dividida entre os clientes
+        report['cold'] = _phase(host, port, paths, clients, -(-len(paths) // clients))
+        report['full'] = _phase(host, port, paths, clients, requests)
+        report['conditional'] = _phase(host, port, paths, clients, requests, _etags(host, port, paths))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    return report
+
+
+def _print_report(report):
+    print(f"{report['clients']} clients, {report['paths']} distinct requests")
+    header = ''.join(f"{'p%d ms' % p:>10}" for p in PERCENTILES)
+    print(f"  {'phase':<12}{'requests':>9}{'req/s':>10}{header}{'max ms':>10}  statuses")
+    for phase in ('cold', 'full', 'conditional'):
+        summary = report[phase]
+        values = ''.join(f"{summary[f'p{p}_s'] * 1000:10.2f}" for p in PERCENTILES)
+        print(f"  {phase:<12}{summary['requests']:9d}{summary['requests_per_s']:10.0f}{values}"
+              f"{summary['max_s'] * 1000:10.2f}  {summary['statuses']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.apiload',
+                                     description='Measure the JSON API throughput with concurrent clients.')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients (default: 8)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per client and phase')
+    parser.add_argument('--url', help='existing server (default: start one in this process)')
+    parser.add_argument('--output', help='also write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    report = api_load(args.clients, args.requests, args.url)
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    errors = sum(total for phase in ('cold', 'full', 'conditional')
+                 for status, total in report[phase]['statuses'].items() if not status.startswith(('2', '3')))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
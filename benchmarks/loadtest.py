@@ -0,0 +1,310 @@
+# Teste de carga: N sessões simultâneas percorrem as quatro páginas, com uma interação em
+# cada, e o teste mede vazão e percentis de latência. Dois clientes:
+#
+#   threads  cada sessão em sua própria thread (como no servidor), executando as mesmas
+#            chamadas de sdg que as páginas fazem, com seleções diferentes por sessão
+#   apptest  os scripts reais das páginas via AppTest; como o AppTest usa um Runtime global
+#            por processo, cada sessão roda em um processo separado
+#
+#     python -m benchmarks.loadtest --sessions 16 --iterations 2
+#     python -m benchmarks.loadtest --client apptest --sessions 4
+#     python -m benchmarks.loadtest --verify     # desenho concorrente == serial, e escala
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from sdg.data import ROOT
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _nth(options, index):
+    options = list(options)
+    return options[index % len(options)]
+
+
+# Cliente simulado: o trabalho de cada página para a seleção `choice`
+def _sim_attributes(choice, renderer):
+    from sdg.attributes import load_attributes
+    from sdg.tables import create_html_table
+
+    attributes = load_attributes()
+    category = _nth(attributes.groups.keys(), choice)
+    return create_html_table(attributes.groups.frame(attributes.data, category)[["ATTRIBUTE", "METRIC"]])
+
+
+def _sim_view_by_sdg(choice, renderer):
+    from sdg.data import load_dataset
+    from sdg.render import iter_charts
+    from sdg.ui import PORTS_PER_PAGE
+    from sdg.views import sdg_grid_spec, sdg_pair_spec, tema_group, tema_slice
+
+    dataset = load_dataset()
+    tema = _nth(dataset.temas, choice)
+    df_slice, group = tema_slice(dataset, tema), tema_group(dataset, tema)
+    ports = dataset.ports[:PORTS_PER_PAGE]
+    specs = [sdg_grid_spec(df_slice, group, ports, renderer)]
+    specs += [sdg_pair_spec(df_slice, group, port, renderer) for port in ports]
+    return list(iter_charts(specs))
+
+
+def _sim_sdg_per_port(choice, renderer):
+    from sdg.cache import get_chart
+    from sdg.data import load_dataset
+    from sdg.ui import PORTS_PER_PAGE, page_count, page_slice
+    from sdg.views import port_overview_spec
+
+    dataset = load_dataset()
+    page = choice % page_count(len(dataset.ports)) + 1
+    # Em uma base com uma só página de portos, alterna o renderizador
+    renderer = _nth(['matplotlib', 'svg'], choice) if page_count(len(dataset.ports)) == 1 else renderer
+    return get_chart(port_overview_spec(dataset, page_slice(dataset.ports, page, PORTS_PER_PAGE), renderer))
+
+
+def _sim_sdg_and_average(choice, renderer):
+    from sdg.data import load_dataset
+    from sdg.render import iter_charts
+    from sdg.views import TEMAS_INICIAIS, average_halves, tema_group, tema_slice
+
+    dataset = load_dataset()
+    port = _nth(dataset.ports, choice)
+    specs = [spec for tema in dataset.temas[:TEMAS_INICIAIS]
+             for spec in average_halves(tema_slice(dataset, tema), tema_group(dataset, tema), tema, port,
+                                        renderer) or ()]
+    return list(iter_charts(specs))
+
+
+# Cliente AppTest: uma seleção diferente por sessão na interação
+def _app_attributes(at, choice):
+    at.selectbox[0].set_value(_nth(at.selectbox[0].options, choice))
+
+
+def _app_view_by_sdg(at, choice):
+    at.selectbox[0].set_value(_nth(at.selectbox[0].options, choice))
+
+
+def _app_sdg_per_port(at, choice):
+    radio = at.sidebar.radio(key='renderizador')
+    radio.set_value(_nth(radio.options, choice))
+
+
+def _app_sdg_and_average(at, choice):
+    select = next(box for box in at.selectbox if box.label == "Select Port")
+    select.set_value(_nth(select.options, choice))
+
+
+# página -> (script, cliente simulado, interação no AppTest)
+PAGES = {
+    'attributes': ('pages/1_SDG_Attributes_Table.py', _sim_attributes, _app_attributes),
+    'view-by-sdg': ('pages/2_View_by_SDG.py', _sim_view_by_sdg, _app_view_by_sdg),
+    'sdg-per-port': ('pages/3_SDG_per_Port.py', _sim_sdg_per_port, _app_sdg_per_port),
+    'sdg-and-average': ('pages/4_SDG_and_Average.py', _sim_sdg_and_average, _app_sdg_and_average),
+}
+
+
+def _timed(samples, name, phase, function):
+    start = time.perf_counter()
+    try:
+        function()
+        errors = []
+    except Exception as error:
+        errors = [f"{type(error).__name__}: {error}"]
+    samples.append((name, phase, time.perf_counter() - start, errors))
+    return errors
+
+
+# Uma sessão simulada: abre cada página (seleção padrão) e troca a seleção
+def run_simulated(session, pages, iterations, renderer, timeout=None):
+    samples = []
+    for _ in range(iterations):
+        for name in pages:
+            simulate = PAGES[name][1]
+            _timed(samples, name, 'load', lambda: simulate(0, renderer))
+            _timed(samples, name, 'interaction', lambda: simulate(session + 1, renderer))
+    return samples
+
+
+# Uma sessão real via AppTest (em um processo próprio)
+def run_apptest(session, pages, iterations, renderer, timeout=300):
+    import sys
+
+    from streamlit.testing.v1 import AppTest
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    samples = []
+    for _ in range(iterations):
+        for name in pages:
+            script, _, interact = PAGES[name]
+            at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=timeout)
+            at.session_state['renderizador'] = renderer
+
+            def load():
+                at.run()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+
+            def interaction():
+                interact(at, session + 1)
+                load()
+
+            if not _timed(samples, name, 'load', load):
+                _timed(samples, name, 'interaction', interaction)
+    return samples
+
+
+def summarize(seconds):
+    values = np.asarray(seconds)
+    summary = {'runs': len(values), 'mean_s': float(values.mean()), 'max_s': float(values.max())}
+    summary.update({f'p{p}_s': float(np.percentile(values, p)) for p in PERCENTILES})
+    return summary
+
+
+def load_test(sessions, iterations, pages, renderer, client='threads', timeout=300):
+    if client == 'threads':
+        # Como o servidor iniciado por sdg.serve: o pool de desenho sobe antes das sessões
+        from sdg import render
+        render.start_pool()
+    started = time.perf_counter()
+    if client == 'threads':
+        executor = ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='session')
+        run = run_simulated
+    else:
+        executor = ProcessPoolExecutor(max_workers=sessions, mp_context=multiprocessing.get_context('spawn'))
+        run = run_apptest
+    with executor:
+        futures = [executor.submit(run, session, pages, iterations, renderer, timeout) for session in range(sessions)]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'client': client,
+        'sessions': sessions,
+        'iterations': iterations,
+        'renderer': renderer,
+        'elapsed_s': elapsed,
+        'throughput_runs_per_s': len(samples) / elapsed,
+        'errors': sorted({error for *_, errors in samples for error in errors}),
+        'overall': summarize([seconds for _, _, seconds, _ in samples]),
+        'pages': {},
+    }
+    for name in pages:
+        for phase in ('load', 'interaction'):
+            seconds = [s for page, p, s, _ in samples if page == name and p == phase]
+            if seconds:
+                report['pages'][f'{name}/{phase}'] = summarize(seconds)
+    return report
+
+
+# Verifica o desenho concorrente: cada thread desenha todos os gráficos (em ordem
+# embaralhada, sem cache), um por vez como a página 3 faz, pelo mesmo caminho das páginas
+# (pool de processos, ou a própria thread sem ele). As imagens precisam ser idênticas às do
+# desenho serial, e a vazão precisa crescer com as sessões: com `threads` sessões, pelo
+# menos `min_scaling` vezes o paralelismo disponível (processos do pool limitados aos
+# núcleos; 1 sem pool) sobre a vazão de uma sessão só.
+def verify(threads, renderer, min_scaling=0.5):
+    from sdg import render
+    from sdg.cache import ChartCache
+    from sdg.charts import release_figures, render_chart
+    from sdg.data import load_dataset
+    from sdg.views import average_halves, sdg_grid_spec, tema_group, tema_slice
+    from sdg.warmup import default_specs
+
+    dataset = load_dataset()
+    specs = default_specs(dataset, renderer)
+    for tema in dataset.temas:
+        df_slice, group = tema_slice(dataset, tema), tema_group(dataset, tema)
+        specs.append(sdg_grid_spec(df_slice, group, dataset.ports, renderer))
+        specs.extend(average_halves(df_slice, group, tema, dataset.ports[-1], renderer) or ())
+    expected = [render_chart(spec) for spec in specs]
+    release_figures()
+
+    render.start_pool()
+    executor = render.get_executor(wait=True)
+    parallelism = min(threads, render.WORKERS, os.cpu_count() or 1) if executor is not None else 1
+    # Cache que não guarda nada: toda chamada é uma falta
+    cache = ChartCache(max_bytes=0, directory=None)
+
+    def session(order):
+        images = {index: render.render_many([specs[index]], cache)[0] for index in order}
+        return [index for index in order if images[index] != expected[index]]
+
+    def timed_session(seed, barrier=None):
+        order = list(range(len(specs)))
+        random.Random(seed).shuffle(order)
+        if barrier is not None:
+            barrier.wait()
+        return session(order)
+
+    # Uma passada para subir as figuras do pool, e a vazão de uma sessão sozinha
+    mismatches = set(timed_session(-1))
+    started = time.perf_counter()
+    mismatches.update(timed_session(-2))
+    serial = len(specs) / (time.perf_counter() - started)
+
+    barrier = threading.Barrier(threads)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for result in pool.map(lambda seed: timed_session(seed, barrier), range(threads)):
+            mismatches.update(result)
+    elapsed = time.perf_counter() - started
+    scaling = len(specs) * threads / elapsed / serial
+    return {'charts': len(specs), 'threads': threads, 'elapsed_s': elapsed, 'mismatches': sorted(mismatches),
+            'workers': render.WORKERS if executor is not None else 0, 'serial_charts_per_s': serial,
+            'scaling': scaling, 'expected_scaling': parallelism, 'min_scaling': min_scaling,
+            'scales': scaling >= min_scaling * parallelism}
+
+
+def _print_report(report):
+    print(f"{report['sessions']} {report['client']} sessions x {report['iterations']} iterations ({report['renderer']}): "
+          f"{report['overall']['runs']} runs in {report['elapsed_s']:.1f}s, "
+          f"{report['throughput_runs_per_s']:.2f} runs/s")
+    header = ''.join(f"{'p%d' % p:>9}" for p in PERCENTILES)
+    print(f"  {'page/phase':<30}{'runs':>6}{header}{'max':>9}")
+    for name, summary in [*report['pages'].items(), ('overall', report['overall'])]:
+        values = ''.join(f"{summary[f'p{p}_s']:9.2f}" for p in PERCENTILES)
+        print(f"  {name:<30}{summary['runs']:6d}{values}{summary['max_s']:9.2f}")
+    for error in report['errors']:
+        print(f"  error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest',
+                                     description='Run concurrent Streamlit sessions through every page.')
+    parser.add_argument('--sessions', type=int, default=8, help='concurrent sessions (default: 8)')
+    parser.add_argument('--iterations', type=int, default=1, help='passes over the pages per session')
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES))
+    parser.add_argument('--renderer', choices=['matplotlib', 'svg'], default='matplotlib')
+    parser.add_argument('--client', choices=['threads', 'apptest'], default='threads',
+                        help='simulated sessions in threads, or the real pages via AppTest (one process each)')
+    parser.add_argument('--verify', action='store_true',
+                        help='only check that concurrent rendering matches serial rendering and scales')
+    parser.add_argument('--min-scaling', type=float, default=0.5,
+                        help='with --verify, required fraction of the ideal speedup (default: %(default)s)')
+    parser.add_argument('--output', help='also write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        report = verify(args.sessions, args.renderer, args.min_scaling)
+        print(f"{report['charts']} charts x {report['threads']} threads in {report['elapsed_s']:.1f}s "
+              f"({report['workers']} render workers): {len(report['mismatches'])} mismatches, "
+              f"{report['scaling']:.2f}x the throughput of one session "
+              f"(needs {report['min_scaling'] * report['expected_scaling']:.2f}x)")
+    else:
+        report = load_test(args.sessions, args.iterations, args.pages, args.renderer, args.client)
+        _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    return 1 if report.get('mismatches') or report.get('errors') or report.get('scales') is False else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
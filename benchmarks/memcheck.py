@@ -0,0 +1,85 @@
+# Regressão de memória do desenho dos radares: desenha centenas de gráficos em sequência
+# (sem o cache de imagens), com formatos e números de eixos variados o bastante para que as
+# figuras do pool sejam descartadas e recriadas, e mede o RSS do processo. Depois de um
+# aquecimento (pools de figuras e fundos cheios), o RSS não pode crescer mais que o limite.
+#
+#     python -m benchmarks.memcheck                     # o mesmo da CI (alguns minutos)
+#     python -m benchmarks.memcheck --charts 2000 --warmup 300
+import argparse
+import json
+import os
+import random
+import sys
+
+from sdg.charts import FIGURE_POOL_SIZE, LAYOUTS, make_panel, make_spec, release_figures, render_chart
+
+# Números de eixos usados: mais combinações (formato, N) que figuras no pool
+SIZES = tuple(range(5, 5 + FIGURE_POOL_SIZE + 4))
+
+
+# RSS atual em MB (Linux); fora dele, o pico do processo
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def random_spec(rng, renderer):
+    layout = rng.choice(['single', 'pair', 'pair', 'grid'])
+    num_vars = rng.choice(SIZES)
+    count = {'single': 1, 'pair': 2, 'grid': rng.randint(1, LAYOUTS['grid']['ncols'] * 2)}[layout]
+    labels = [f"{num_vars}.{item:02d}" for item in range(1, num_vars + 1)]
+    panels = [make_panel(f"Port {rng.randint(1, 999)}", [rng.uniform(0, 3) for _ in labels],
+                         style=rng.choice(['port', 'average'])) for _ in range(count)]
+    return make_spec(layout, labels, panels, renderer=renderer)
+
+
+def memcheck(charts, warmup, renderer='matplotlib', every=25, seed=0):
+    rng = random.Random(seed)
+    samples = [(0, rss_mb())]
+    for index in range(1, charts + 1):
+        render_chart(random_spec(rng, renderer))
+        if index % every == 0 or index == warmup:
+            samples.append((index, rss_mb()))
+    release_figures()
+    baseline = max(rss for index, rss in samples if index <= warmup)
+    peak = max(rss for _, rss in samples)
+    return {'charts': charts, 'warmup': warmup, 'renderer': renderer, 'baseline_mb': baseline,
+            'peak_mb': peak, 'growth_mb': peak - baseline, 'samples': samples}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.memcheck',
+                                     description='Render thousands of charts and check that RSS stays bounded.')
+    parser.add_argument('--charts', type=int, default=500, help='charts rendered (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=200,
+                        help='charts rendered before the baseline is taken (default: %(default)s)')
+    parser.add_argument('--max-growth-mb', type=float, default=64,
+                        help='allowed RSS growth after the warm-up (default: %(default)s)')
+    parser.add_argument('--renderer', choices=['matplotlib', 'svg'], default='matplotlib')
+    parser.add_argument('--output', help='also write the report as JSON to this file')
+    args = parser.parse_args(argv)
+    if not 0 < args.warmup < args.charts:
+        parser.error('--warmup must be between 0 and --charts')
+
+    import matplotlib
+    matplotlib.use('Agg')
+    report = memcheck(args.charts, args.warmup, args.renderer)
+    for index, rss in report['samples']:
+        print(f"  {index:6d} charts {rss:8.1f} MB")
+    print(f"{report['charts']} {report['renderer']} charts: RSS {report['baseline_mb']:.1f} MB after "
+          f"{report['warmup']}, peak {report['peak_mb']:.1f} MB (+{report['growth_mb']:.1f} MB, "
+          f"limit {args.max_growth_mb:g} MB)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    return 1 if report['growth_mb'] > args.max_growth_mb else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
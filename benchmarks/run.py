@@ -0,0 +1,168 @@
+# Mede os caminhos quentes do app (leitura da base, groupby por TEMA, tabela HTML e radares)
+# sobre bases sintéticas escaladas e acrescenta os resultados em um arquivo JSON Lines.
+#
+#     python -m benchmarks.run --scales 10 100 1000
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from sdg import charts
+from sdg.attributes import normalize, read_workbook
+from sdg.charts import release_figures, render_chart
+from sdg.composite import COMPOSERS
+from sdg.data import read_base
+from sdg.peers import kmeans, nearest_peers, peer_features
+from sdg.stats import compute_statistics
+from sdg.tables import create_html_table
+from sdg.ui import PORTS_PER_PAGE
+from sdg.views import port_overview_spec, sdg_grid_spec, sdg_pair_spec, tema_group, tema_slice
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'data')
+RESULTS_PATH = os.path.join(HERE, 'results.jsonl')
+
+
+# Uma execução sob tracemalloc para o pico de memória e `repeat` execuções cronometradas sem ele
+def measure(function, repeat):
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return result, {
+        'seconds_min': min(times),
+        'seconds_median': statistics.median(times),
+        'repeat': repeat,
+        'peak_mb': peak / 2**20,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Casos medidos em uma escala: {nome: estatísticas} e o formato da base gerada
+def bench_scale(scale, repeat, renderers):
+    base_path, attributes_path = generate(scale, os.path.join(DATA_DIR, f'x{scale}'))
+    results = {}
+
+    dataset, results['load_data'] = measure(lambda: read_base(base_path), repeat)
+    df, ports = dataset.df, dataset.ports
+    results['groupby_tema'] = measure(
+        lambda: df.groupby('TEMA', observed=True)[ports + ['MEDIA']].mean(), repeat)[1]
+    results['tema_statistics'] = measure(lambda: compute_statistics(dataset), repeat)[1]
+
+    # Semelhança entre portos sobre todos os indicadores (sem o cache por versão)
+    features = peer_features(dataset)
+    results['nearest_peers'] = measure(lambda: nearest_peers(features, 5), repeat)[1]
+    results['kmeans'] = measure(lambda: kmeans(features, 4), repeat)[1]
+
+    attributes, results['load_attributes'] = measure(
+        lambda: normalize(read_workbook(attributes_path)), repeat)
+    results['create_html_table'] = measure(lambda: create_html_table(attributes), repeat)[1]
+
+    # Radares como nas páginas: uma página de portos do maior tema
+    tema = max(dataset.temas, key=lambda tema: len(tema_slice(dataset, tema)))
+    df_slice, group = tema_slice(dataset, tema), tema_group(dataset, tema)
+    page = ports[:PORTS_PER_PAGE]
+    for renderer in renderers:
+        specs = {
+            'sdg_grid': sdg_grid_spec(df_slice, group, page, renderer),
+            'sdg_pair': sdg_pair_spec(df_slice, group, page[0], renderer),
+            'port_overview': port_overview_spec(dataset, page, renderer),
+        }
+        for name, spec in specs.items():
+            image, stats = measure(lambda: render_chart(spec), repeat)
+            stats['bytes'] = len(image)
+            results[f'radar_{name}_{renderer}'] = stats
+
+        # Os pares porto/média da página: mesmo N, só os polígonos mudam entre eles. No
+        # matplotlib, também sem o cache de fundos, e a composição deles em uma única imagem.
+        pairs = [sdg_pair_spec(df_slice, group, porto, renderer) for porto in page]
+        images, results[f'radar_pairs_{renderer}'] = measure(lambda: [render_chart(s) for s in pairs], repeat)
+        if renderer == 'matplotlib':
+            cached, charts.BACKGROUND_CACHE_MB = charts.BACKGROUND_CACHE_MB, 0
+            try:
+                results['radar_pairs_full_matplotlib'] = measure(lambda: [render_chart(s) for s in pairs], repeat)[1]
+            finally:
+                charts.BACKGROUND_CACHE_MB = cached
+        image, stats = measure(lambda: COMPOSERS[pairs[0].fmt](images), repeat)
+        stats['bytes'] = len(image)
+        results[f'radar_pairs_compose_{renderer}'] = stats
+        release_figures()
+
+    shape = {
+        'rows': len(df),
+        'ports': len(ports),
+        'temas': len(dataset.temas),
+        'max_items': int(df_slice['ITEM_AJUST'].nunique()),
+        'attribute_rows': len(attributes),
+        'base_mb': os.path.getsize(base_path) / 2**20,
+    }
+    return shape, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description='Benchmark the app hot paths on scaled synthetic data.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100],
+                        help='row and port multipliers (default: 10 100; 1000 needs ~1 GB of disk)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case (default: 3)')
+    parser.add_argument('--renderer', nargs='+', choices=['matplotlib', 'svg'], default=['matplotlib', 'svg'],
+                        dest='renderers')
+    parser.add_argument('--output', default=RESULTS_PATH, help='JSON Lines file the results are appended to')
+    args = parser.parse_args(argv)
+
+    matplotlib.use('Agg')
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+    }
+    with open(args.output, 'a', encoding='utf-8') as file:
+        for scale in args.scales:
+            shape, results = bench_scale(scale, args.repeat, args.renderers)
+            record = {**run, 'scale': scale, **shape, 'max_rss_mb': _max_rss_mb(), 'results': results}
+            file.write(json.dumps(record) + '\n')
+            file.flush()
+
+            print(f"x{scale}: {shape['rows']} rows, {shape['ports']} ports, {shape['max_items']} items")
+            for name, stats in results.items():
+                print(f"  {name:<32} {stats['seconds_min'] * 1000:10.1f} ms  {stats['peak_mb']:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Gera BASE.csv e SDG_attributes_ANEXO.xlsx sintéticos, com as mesmas colunas dos arquivos
+# reais e `scale` vezes mais linhas e portos.
+#
+#     python -m benchmarks.synthetic --scale 100 --output benchmarks/data/x100
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from sdg.attributes import ATTRIBUTES_PATH
+from sdg.data import BASE_PATH
+
+SEED = 20240101
+
+
+# BASE.csv com `scale` vezes mais itens por tema (mais temas a partir de 10x) e portos
+def make_base(scale, base_path=BASE_PATH, seed=SEED):
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(base_path, delimiter=';')
+    meta = ['QUESTAO', 'TEMA', 'AREA', 'EIXO', 'ITEM', 'ITEM_AJUST']
+
+    copies = []
+    for copy in range(scale):
+        block = base[meta].copy()
+        if copy:
+            # Novos temas a cada 10 cópias; dentro deles, itens numerados de novo
+            block['TEMA'] = block['TEMA'] + (f" #{copy // 10}" if copy >= 10 else "")
+            block['AREA'] = block['AREA'] + f" {copy % 10}"
+            block['QUESTAO'] = block['QUESTAO'] + f" ({copy})"
+            block['ITEM_AJUST'] = block['ITEM_AJUST'] + copy * 100
+        copies.append(block)
+    meta_df = pd.concat(copies, ignore_index=True)
+
+    ports = [f"Port {i:05d}" for i in range(6 * scale)]
+    scores = pd.DataFrame(rng.integers(0, 4, size=(len(meta_df), len(ports)), dtype=np.int8),
+                          columns=ports)
+    return pd.concat([meta_df, scores], axis=1)
+
+
+# Planilha de atributos com `scale` vezes mais linhas (células mescladas viram vazias)
+def make_attributes(scale, attributes_path=ATTRIBUTES_PATH):
+    data = pd.read_excel(attributes_path)
+    copies = []
+    for copy in range(scale):
+        block = data.copy()
+        if copy:
+            block['CATEGORY'] = block['CATEGORY'].map(lambda value: value if pd.isna(value) else f"{value} #{copy}")
+            block['ATTRIBUTE'] = block['ATTRIBUTE'].map(lambda value: value if pd.isna(value) else f"{value} ({copy})")
+        copies.append(block)
+    return pd.concat(copies, ignore_index=True)
+
+
+def write_attributes(data, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(data.columns))
+    for row in data.itertuples(index=False):
+        sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+
+
+# Gera (ou reaproveita) os dois arquivos na pasta `output` e devolve seus caminhos
+def generate(scale, output, force=False):
+    os.makedirs(output, exist_ok=True)
+    base_path = os.path.join(output, 'BASE.csv')
+    attributes_path = os.path.join(output, 'SDG_attributes_ANEXO.xlsx')
+    if force or not os.path.exists(base_path):
+        make_base(scale).to_csv(base_path, sep=';', index=False)
+    if force or not os.path.exists(attributes_path):
+        write_attributes(make_attributes(scale), attributes_path)
+    return base_path, attributes_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.synthetic',
+                                     description='Generate scaled synthetic BASE.csv and attributes workbook.')
+    parser.add_argument('--scale', type=int, required=True, help='row and port multiplier (e.g. 10, 100, 1000)')
+    parser.add_argument('--output', help='output folder (default: benchmarks/data/x<scale>)')
+    parser.add_argument('--force', action='store_true', help='overwrite existing files')
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', f'x{args.scale}')
+    for path in generate(args.scale, output, force=args.force):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
 import streamlit as st
-import pandas as pd
+
+from sdg import metrics
+from sdg.attributes import ATTRIBUTES_PATH, MissingColumnsError, load_attributes
+from sdg.tables import create_html_table
+from sdg.ui import diagnostics_panel, download_buttons
+from sdg.warmup import start_warmup
 
 # Configuração da página
 st.set_page_config(
@@ -7,25 +12,19 @@ st.set_page_config(
     page_icon="🌱",
     layout="wide"
 )
+trace = metrics.begin("SDG Attributes Table")
+start_warmup()
 
-# Carregando o arquivo Excel
-file_path = file_path = "SDG_attributes_ANEXO.xlsx"  # Ajuste o caminho conforme necessário
+# Carregando a planilha (lida uma vez e mantida em snapshot colunar até o arquivo mudar)
+file_path = ATTRIBUTES_PATH
 try:
-    data = pd.read_excel(file_path)
-    
-    # Validar se as colunas necessárias estão presentes
-    required_columns = ["CATEGORY", "ATTRIBUTE", "AREA", "METRIC"]
-    missing_columns = [col for col in required_columns if col not in data.columns]
-    if missing_columns:
-        st.error(f"Erro: As seguintes colunas estão faltando no arquivo: {', '.join(missing_columns)}")
-        st.stop()
-
-    # Tratamento da coluna CATEGORY para preencher valores NaN
-    data["CATEGORY"] = data["CATEGORY"].fillna(method="ffill")
-
-    # Tratamento da coluna ATTRIBUTE para preencher valores NaN
-    data["ATTRIBUTE"] = data["ATTRIBUTE"].fillna(method="ffill")
+    with metrics.span("load"):
+        attributes = load_attributes(file_path)
+    data = attributes.data
 
+except MissingColumnsError as e:
+    st.error(f"Erro: {e}")
+    st.stop()
 except FileNotFoundError as e:
     st.error(f"Erro: O arquivo '{file_path}' não foi encontrado. {e}")
     st.stop()
@@ -41,59 +40,34 @@ st.write("This model presents the sustainability indicators associated with the
 col1, col2 = st.columns([2, 2])  # Ajusta as larguras das colunas
 with col1:
     # SelectBox para CATEGORY
-    categories = data["CATEGORY"].unique()
+    categories = attributes.groups.keys()
     selected_category = st.selectbox("Select an SDG", options=categories)
 
 with col2:
     # SelectBox para AREA
-    areas = data[data["CATEGORY"] == selected_category]["AREA"].unique()
+    areas = attributes.groups.children(selected_category)
     selected_area = st.selectbox("Filter by AREA", options=["ALL"] + list(areas))
 
-# Filtrando o DataFrame com base nas seleções
-filtered_data = data[data["CATEGORY"] == selected_category]
-if selected_area != "ALL":
-    filtered_data = filtered_data[filtered_data["AREA"] == selected_area]
-
-# Função para criar HTML com células mescladas na coluna ATTRIBUTE e linhas alternadas
-def create_html_table(df):
-    html = """
-    <table style='width:100%; border-collapse: collapse;'>
-        <thead>
-            <tr style='background-color: #333333; color: white; font-weight: bold; border: 1px solid black;'>
-                <th style='text-align: center; padding: 8px; border: 1px solid black;'>ATTRIBUTE</th>
-                <th style='text-align: center; padding: 8px; border: 1px solid black;'>METRIC</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-    
-    previous_attribute = None
-    row_color = "#FFFFFF"  # Branco
-    alternate_color = "#F2F2F2"  # Cinza claro
+# Filtrando o DataFrame com base nas seleções (fatia pré-calculada no índice CATEGORY -> AREA)
+with metrics.span("filter"):
+    filtered_data = attributes.groups.frame(data, selected_category, selected_area)
 
-    for _, row in df.iterrows():
-        attribute = row["ATTRIBUTE"]
-        metric = row["METRIC"]
-
-        # Alterna a cor de fundo quando o valor do atributo muda
-        if attribute != previous_attribute:
-            row_color = alternate_color if row_color == "#FFFFFF" else "#FFFFFF"
-            rowspan_count = (df["ATTRIBUTE"] == attribute).sum()
-            html += f"<tr style='background-color: {row_color};'><td rowspan='{rowspan_count}' style='border: 1px solid black; padding: 8px; text-align: left;'>{attribute}</td>"
-            previous_attribute = attribute
-        else:
-            html += f"<tr style='background-color: {row_color};'>"
-
-        # Adiciona a célula METRIC
-        html += f"<td style='border: 1px solid black; padding: 8px; text-align: left;'>{metric}</td></tr>"
-
-    html += "</tbody></table>"
-    return html
+# HTML da tabela em cache por seleção (categoria, área) e versão do arquivo
+@st.cache_data(max_entries=512, show_spinner=False)
+def html_table_for(category, area, version, _df):
+    metrics.miss("html_table")
+    return create_html_table(_df[["ATTRIBUTE", "METRIC"]])
 
 # Exibindo o DataFrame filtrado no Streamlit com HTML customizado
 if not filtered_data.empty:
     st.subheader(f"Filtered Results for {selected_category}")
-    html_table = create_html_table(filtered_data[["ATTRIBUTE", "METRIC"]])
+    download_buttons("sdg_attributes", [selected_category, selected_area], attributes.version,
+                     lambda: filtered_data, key="download")
+    with metrics.span("table"), metrics.lookup("html_table"):
+        html_table = html_table_for(selected_category, selected_area, attributes.version, filtered_data)
     st.markdown(html_table, unsafe_allow_html=True)
 else:
     st.write("No data available for display.")
+
+diagnostics_panel(trace)
+metrics.end(trace)
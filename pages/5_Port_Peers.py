@@ -0,0 +1,78 @@
+import streamlit as st
+import pandas as pd
+
+from sdg import metrics
+from sdg.cache import get_chart
+from sdg.data import load_dataset
+from sdg.peers import port_clusters, port_peers, rankings, scopes
+from sdg.ui import diagnostics_panel, renderer_selector, show_chart, statistic_selector, watch_dataset
+from sdg.views import port_overview_spec
+from sdg.warmup import start_warmup
+
+st.set_page_config(
+    page_title="Port Peers",
+    page_icon="🌱",
+    layout="wide"
+)
+trace = metrics.begin("Port Peers")
+start_warmup()
+
+# Carregar os dados compartilhados por todas as sessões (uma única cópia por processo)
+try:
+    with metrics.span("load"):
+        dataset = load_dataset()
+    df = dataset.df
+except FileNotFoundError:
+    st.error("O arquivo não foi encontrado.")
+    df = pd.DataFrame()
+
+# Verificar se o DataFrame foi carregado corretamente
+if df.empty:
+    st.error("Não foi possível carregar os dados. Verifique o arquivo fornecido.")
+elif len(dataset.ports) < 2:
+    st.info("At least two ports are needed to compare peers.")
+else:
+    # Atualiza a página quando BASE.csv mudar
+    watch_dataset(dataset)
+
+    # Configuração do layout do Streamlit
+    st.markdown("<h1 style='text-align: center;'>Port Peers</h1>", unsafe_allow_html=True)
+
+    # Variáveis usadas na comparação e parâmetros das análises
+    escopo = st.sidebar.selectbox("Compare on", scopes(dataset), key="escopo",
+                                  help="Scores of every indicator, the SDG means, or the indicators of one SDG.")
+    if len(dataset.ports) > 2:
+        vizinhos = st.sidebar.slider("Peers per port", 1, min(10, len(dataset.ports) - 1),
+                                     min(3, len(dataset.ports) - 1), key="vizinhos")
+    else:
+        vizinhos = 1  # com dois portos, o outro é o único par possível (o slider não teria intervalo)
+    grupos = st.sidebar.slider("Clusters", 1, min(8, len(dataset.ports)), min(3, len(dataset.ports)),
+                               key="grupos")
+    renderizador = renderer_selector(key="renderizador")
+    estatistica = statistic_selector(key="estatistica")
+
+    # Vizinhos mais próximos do porto selecionado
+    porto = st.selectbox("Select Port", dataset.ports, key="porto")
+    with metrics.span("peers"):
+        pares = port_peers(dataset, porto, vizinhos, escopo)
+    st.subheader("Nearest peers")
+    st.caption("Distance: root mean square difference of the scores, in score points.")
+    st.dataframe(pares[['RANK', 'PEER', 'DISTANCE']].round(3), hide_index=True)
+
+    # Perfil por SDG do porto ao lado dos de seus vizinhos
+    with metrics.span("charts"):
+        show_chart(get_chart(port_overview_spec(dataset, [porto] + list(pares['PEER']), renderizador,
+                                                statistic=estatistica)))
+
+    st.subheader("Clusters")
+    with metrics.span("clusters"):
+        agrupamento = port_clusters(dataset, grupos, escopo)
+    st.dataframe(agrupamento.round(2), hide_index=True)
+
+    st.subheader("Rankings")
+    st.caption("Position of each port by mean score, overall and in each SDG (1 = highest).")
+    with metrics.span("rankings"):
+        st.dataframe(rankings(dataset))
+
+diagnostics_panel(trace)
+metrics.end(trace)
@@ -0,0 +1 @@
+# Módulos compartilhados pelas páginas do Streamlit (dados, gráficos de radar e caches).
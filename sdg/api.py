@@ -0,0 +1,332 @@
+# API HTTP local, somente leitura, com os mesmos dados das páginas em JSON compacto:
+# fatias TEMA/AREA, médias (MEDIA), estatísticas por TEMA, tabela de atributos, vizinhos e
+# rankings dos portos. O ETag de cada resposta é derivado do endpoint, dos parâmetros e da
+# versão dos arquivos, então pode ser conferido antes de montar a resposta: requisições
+# condicionais (If-None-Match) respondem 304 sem tocar nos dados, e as demais saem de um
+# cache em memória até os arquivos mudarem.
+#
+#     python -m sdg.api --port 8502 &  streamlit run Home.py
+#     curl -s 'localhost:8502/api/slice?tema=SDG%2007&area=All'
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from sdg import metrics
+from sdg.attributes import load_attributes
+from sdg.cache import ChartCache
+from sdg.peers import ALL_ITEMS, peer_table, port_peers, rankings, scopes
+from sdg.periods import CURRENT, list_periods, load_period
+from sdg.stats import MEAN, STATISTICS, tema_statistic
+from sdg.views import tema_areas, tema_slice
+
+DEFAULT_PORT = 8502
+
+# Respostas guardadas em memória, por ETag (LRU limitado em bytes)
+CACHE_MB = 32
+
+# Respostas menores que isso não compensam a compressão
+GZIP_MIN_BYTES = 1024
+
+# Casas decimais dos números em ponto flutuante
+DECIMALS = 4
+
+ITEM_COLUMNS = ['QUESTAO', 'TEMA', 'AREA', 'EIXO', 'ITEM', 'ITEM_AJUST']
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Endpoints: caminho -> (função, fontes de dados que definem a versão da resposta)
+ENDPOINTS = {}
+
+
+def endpoint(path, *sources):
+    def register(function):
+        ENDPOINTS[path] = (function, sources)
+        return function
+    return register
+
+
+def _dataset(params):
+    period = params.get('period', CURRENT)
+    try:
+        return load_period(period)
+    except FileNotFoundError:
+        raise ApiError(404, f"Unknown period: {period!r}")
+
+
+class PeriodList(NamedTuple):
+    periods: list
+    version: str
+
+
+def _periods(params):
+    periods = [CURRENT] + list_periods()
+    return PeriodList(periods, ','.join(periods))
+
+
+SOURCES = {
+    'dataset': _dataset,
+    'attributes': lambda params: load_attributes(),
+    'periods': _periods,
+}
+
+
+def _choice(value, options, name):
+    if value not in options:
+        raise ApiError(404, f"Unknown {name}: {value!r}")
+    return value
+
+
+# Parâmetros com valores fixos (não dependem dos dados): fora da lista é um pedido inválido
+def _option(params, name, default, options):
+    value = params.get(name, default)
+    if value not in options:
+        raise ApiError(400, f"'{name}' must be one of: {', '.join(options)}")
+    return value
+
+
+def _integer(params, name, default, low, high):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    return min(max(value, low), high)
+
+
+def _ports(params, dataset):
+    if 'ports' not in params:
+        return dataset.ports
+    return [_choice(port, dataset.ports, 'port') for port in params['ports'].split(',') if port]
+
+
+def _tema_slice(params, dataset):
+    if 'tema' not in params:
+        return dataset.df
+    tema = _choice(params['tema'], dataset.temas, 'tema')
+    area = params.get('area', 'All')
+    if area != 'All':
+        _choice(area, tema_areas(dataset, tema), 'area')
+    return tema_slice(dataset, tema, area)
+
+
+@endpoint('/api')
+def index(params):
+    return {'endpoints': sorted(ENDPOINTS), 'statistics': STATISTICS}
+
+
+@endpoint('/api/periods', 'periods')
+def periods(params, periods):
+    return {'periods': periods.periods}
+
+
+@endpoint('/api/ports', 'dataset')
+def ports(params, dataset):
+    return {'ports': dataset.ports}
+
+
+@endpoint('/api/temas', 'dataset')
+def temas(params, dataset):
+    return {'temas': [{'tema': tema, 'areas': tema_areas(dataset, tema)} for tema in dataset.temas]}
+
+
+# Linhas da fatia TEMA/AREA (todas sem `tema`), com os portos pedidos (todos sem `ports`) e a MEDIA
+@endpoint('/api/slice', 'dataset')
+def slice_(params, dataset):
+    return _tema_slice(params, dataset)[ITEM_COLUMNS + _ports(params, dataset) + ['MEDIA']]
+
+
+@endpoint('/api/media', 'dataset')
+def media(params, dataset):
+    return _tema_slice(params, dataset)[['TEMA', 'AREA', 'ITEM_AJUST', 'MEDIA']]
+
+
+@endpoint('/api/statistics', 'dataset')
+def statistics(params, dataset):
+    statistic = _option(params, 'statistic', MEAN, STATISTICS)
+    return tema_statistic(dataset, statistic)[['TEMA'] + _ports(params, dataset) + ['MEDIA']]
+
+
+@endpoint('/api/attributes', 'attributes')
+def attributes(params, attributes):
+    if 'category' not in params:
+        return attributes.data
+    category = _choice(params['category'], attributes.groups.keys(), 'category')
+    area = params.get('area', 'ALL')
+    if area != 'ALL':
+        _choice(area, attributes.groups.children(category), 'area')
+    return attributes.groups.frame(attributes.data, category, area)
+
+
+@endpoint('/api/peers', 'dataset')
+def peers(params, dataset):
+    k = _integer(params, 'k', 5, 1, max(len(dataset.ports) - 1, 1))
+    scope = _choice(params.get('scope', ALL_ITEMS), scopes(dataset), 'scope')
+    if 'port' in params:
+        return port_peers(dataset, _choice(params['port'], dataset.ports, 'port'), k, scope)
+    return peer_table(dataset, k, scope)
+
+
+@endpoint('/api/rankings', 'dataset')
+def port_rankings(params, dataset):
+    return rankings(dataset).reset_index()
+
+
+# JSON compacto: tabelas no formato {"columns": [...], "data": [[...], ...]}, NaN como null
+def encode(result):
+    if isinstance(result, pd.DataFrame):
+        return result.to_json(orient='split', index=False, double_precision=DECIMALS).encode('utf-8')
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def make_etag(path, params, versions):
+    payload = json.dumps([path, sorted(params.items()), versions], ensure_ascii=False)
+    return '"' + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def _matches(header, etag):
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+class Api:
+    def __init__(self, cache_mb=CACHE_MB):
+        self.cache = ChartCache(max_bytes=cache_mb * 2**20, directory=None)
+
+    # Responde a um GET: (status, cabeçalhos, corpo)
+    def handle(self, target, if_none_match=None, accept_gzip=False):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/api'
+        if path not in ENDPOINTS:
+            return self._error(404, f"Unknown endpoint: {path}")
+        function, sources = ENDPOINTS[path]
+        params = dict(parse_qsl(url.query))
+        try:
+            try:
+                loaded = {name: SOURCES[name](params) for name in sources}
+            except (OSError, ValueError) as error:
+                # Arquivo de dados ausente ou ilegível (por exemplo, a planilha de atributos)
+                metrics.count('api', 'unavailable')
+                raise ApiError(503, f"Data unavailable: {error}")
+            etag = make_etag(path, params, [loaded[name].version for name in sources])
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+            if _matches(if_none_match, etag):
+                metrics.count('api', 'not_modified')
+                return 304, headers, b''
+
+            body = self.cache.get(etag, 'json')
+            metrics.count('api', 'miss' if body is None else 'hit')
+            if body is None:
+                try:
+                    body = encode(function(params, **loaded))
+                except (OSError, ValueError) as error:
+                    metrics.count('api', 'error')
+                    raise ApiError(500, f"Internal error: {error}")
+                self.cache.put(etag, body, 'json')
+        except ApiError as error:
+            return self._error(error.status, str(error))
+
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        if accept_gzip and len(body) >= GZIP_MIN_BYTES:
+            compressed = self.cache.get(etag + '.gz', 'json.gz')
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6, mtime=0)
+                self.cache.put(etag + '.gz', compressed, 'json.gz')
+            headers['Content-Encoding'] = 'gzip'
+            body = compressed
+        return 200, headers, body
+
+    @staticmethod
+    def _error(status, message):
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, encode({'error': message})
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # conexões persistentes
+    # Cabeçalhos e corpo saem em escritas separadas; sem TCP_NODELAY, o algoritmo de Nagle
+    # somado ao ACK atrasado do cliente segura cada resposta por ~40 ms
+    disable_nagle_algorithm = True
+    server_version = 'sdg-api'
+    api = None
+    quiet = True
+
+    def _respond(self, send_body):
+        try:
+            status, headers, body = self.api.handle(
+                self.path, self.headers.get('If-None-Match'), 'gzip' in self.headers.get('Accept-Encoding', ''),
+            )
+        except Exception as error:
+            # Sempre responde: sem isso, clientes com conexão persistente ficariam esperando
+            self.log_error("%s", error)
+            status, headers, body = Api._error(500, "Internal error")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+# Uma thread por conexão; a fila de conexões padrão (5) faz clientes simultâneos esperarem
+# a retransmissão do SYN (~1 s)
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+# port=0 escolhe uma porta livre (server.server_port)
+def make_server(host='127.0.0.1', port=DEFAULT_PORT, api=None, quiet=True):
+    handler = type('Handler', (ApiHandler,), {'api': api or Api(), 'quiet': quiet})
+    return ApiServer((host, port), handler)
+
+
+# Inicia o servidor em uma thread de fundo (testes e benchmarks)
+def start_server(host='127.0.0.1', port=0, api=None):
+    server = make_server(host, port, api)
+    threading.Thread(target=server.serve_forever, name='sdg-api', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sdg.api', description='Serve the SDG data as a read-only JSON API.')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port (default: %(default)s)')
+    parser.add_argument('--cache-mb', type=float, default=CACHE_MB, help='response cache size (default: %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, Api(args.cache_mb), quiet=not args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
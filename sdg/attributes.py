@@ -0,0 +1,172 @@
+import os
+import pickle
+import tempfile
+import threading
+from typing import NamedTuple
+
+import pandas as pd
+
+from sdg import metrics
+from sdg.data import ROOT, file_hash
+from sdg.groups import GroupIndex
+
+# A planilha acompanha as páginas; aceita também uma cópia na raiz do projeto
+ATTRIBUTES_FILE = 'SDG_attributes_ANEXO.xlsx'
+ATTRIBUTES_PATH = os.environ.get('SDG_ATTRIBUTES_PATH') or next(
+    (path for path in (os.path.join(ROOT, ATTRIBUTES_FILE), os.path.join(ROOT, 'pages', ATTRIBUTES_FILE))
+     if os.path.exists(path)),
+    os.path.join(ROOT, 'pages', ATTRIBUTES_FILE),
+)
+SNAPSHOT_DIR = os.path.join(ROOT, '.cache', 'attributes')
+
+# Snapshots mantidos em disco (os usados mais recentemente); versões antigas da planilha
+# são apagadas a cada snapshot novo
+SNAPSHOT_KEEP = 4
+
+REQUIRED_COLUMNS = ["CATEGORY", "ATTRIBUTE", "AREA", "METRIC"]
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, missing):
+        self.missing = missing
+        super().__init__(f"As seguintes colunas estão faltando no arquivo: {', '.join(missing)}")
+
+
+class AttributeTable(NamedTuple):
+    data: pd.DataFrame   # CATEGORY/ATTRIBUTE/AREA/METRIC já normalizados
+    version: str         # hash do conteúdo da planilha
+    path: str
+    groups: GroupIndex   # CATEGORY -> AREA -> linhas
+
+
+# Último snapshot carregado por caminho, junto com a assinatura (mtime, tamanho) do arquivo
+_tables = {}
+_lock = threading.Lock()
+
+
+# Lê a primeira aba em modo somente leitura (streaming), sem carregar estilos nem fórmulas
+def read_workbook(path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        columns = [str(column).strip() if column is not None else '' for column in header]
+        return pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        workbook.close()
+
+
+# Valida as colunas, converte-as para texto e preenche CATEGORY/ATTRIBUTE das células mescladas
+def normalize(data):
+    missing = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+    if missing:
+        raise MissingColumnsError(missing)
+    data = data[REQUIRED_COLUMNS].dropna(how='all').reset_index(drop=True)
+    # Células numéricas em colunas de texto (um METRIC como 2030) viram texto; vazias seguem NaN
+    for column in REQUIRED_COLUMNS:
+        data[column] = data[column].astype(str).where(data[column].notna())
+    data["CATEGORY"] = data["CATEGORY"].ffill()
+    data["ATTRIBUTE"] = data["ATTRIBUTE"].ffill()
+    return data
+
+
+def _snapshot_path(version, suffix):
+    return os.path.join(SNAPSHOT_DIR, f'{version}.{suffix}')
+
+
+def _read_snapshot(version):
+    for suffix, read in (('parquet', pd.read_parquet), ('pkl', pd.read_pickle)):
+        path = _snapshot_path(version, suffix)
+        try:
+            data = read(path)
+        except (ImportError, OSError, ValueError):
+            continue
+        try:
+            os.utime(path)  # mtime serve de relógio LRU para a poda
+        except OSError:
+            pass
+        return data
+    return None
+
+
+# Apaga os snapshots além dos SNAPSHOT_KEEP mais recentes (gravações em andamento ficam)
+def _prune_snapshots(keep=SNAPSHOT_KEEP):
+    snapshots = []
+    try:
+        names = os.listdir(SNAPSHOT_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(SNAPSHOT_DIR, name)
+        try:
+            snapshots.append((os.stat(path).st_mtime, path))
+        except OSError:
+            continue
+    for _, path in sorted(snapshots, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Grava o snapshot colunar (Parquet, ou pickle se não houver engine Parquet ou o Arrow
+# recusar os tipos) de forma atômica; sem snapshot, a planilha só é lida de novo
+def _write_snapshot(version, data):
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix='.tmp')
+        os.close(fd)
+    except OSError:
+        return
+    try:
+        try:
+            data.to_parquet(tmp_path, index=False)
+            suffix = 'parquet'
+        except (ImportError, TypeError, ValueError, NotImplementedError):  # erros do Arrow incluídos
+            data.to_pickle(tmp_path)
+            suffix = 'pkl'
+        os.replace(tmp_path, _snapshot_path(version, suffix))
+    except (OSError, TypeError, ValueError, pickle.PicklingError):
+        pass
+    else:
+        _prune_snapshots()
+    finally:
+        try:
+            os.remove(tmp_path)  # só existe se a gravação falhou
+        except OSError:
+            pass
+
+
+def _build(path):
+    version = file_hash(path)
+    data = _read_snapshot(version)
+    if data is None:
+        with metrics.span('parse_excel'):
+            data = normalize(read_workbook(path))
+        _write_snapshot(version, data)
+    return AttributeTable(data, version, path, GroupIndex(data, 'CATEGORY', 'AREA'))
+
+
+# Tabela de atributos normalizada; só relê a planilha quando mtime ou conteúdo mudam
+def load_attributes(path=ATTRIBUTES_PATH):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == signature:
+        metrics.count('attributes', 'hit')
+        return cached[1]
+    metrics.count('attributes', 'miss')
+    with _lock:
+        cached = _tables.get(path)
+        if cached is None or cached[0] != signature:
+            previous = cached[1] if cached is not None else None
+            if previous is not None and previous.version == file_hash(path):
+                table = previous  # só o mtime mudou
+            else:
+                table = _build(path)
+            cached = _tables[path] = (signature, table)
+    return cached[1]
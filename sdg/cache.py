@@ -0,0 +1,159 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from sdg import metrics
+from sdg.charts import render_chart
+
+# Configuração via variáveis de ambiente (SDG_CHART_CACHE_DIR vazio desativa o disco)
+DEFAULT_MEMORY_MB = float(os.environ.get('SDG_CHART_CACHE_MB', 64))
+DEFAULT_DISK_MB = float(os.environ.get('SDG_CHART_CACHE_DISK_MB', 512))
+DEFAULT_DIRECTORY = os.environ.get(
+    'SDG_CHART_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'charts'),
+)
+
+# Quantas gravações em disco entre duas verificações do limite de bytes
+PRUNE_EVERY = 64
+
+
+# Cache de imagens de gráficos endereçado pelo conteúdo (ChartSpec.key()).
+# Camada em memória LRU limitada em bytes + camada em disco compartilhada entre processos.
+class ChartCache:
+    def __init__(self, max_bytes=DEFAULT_MEMORY_MB * 2**20, directory=DEFAULT_DIRECTORY,
+                 max_disk_bytes=DEFAULT_DISK_MB * 2**20):
+        self.max_bytes = int(max_bytes)
+        self.directory = directory or None
+        self.max_disk_bytes = int(max_disk_bytes)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def _path(self, key, fmt):
+        return os.path.join(self.directory, key[:2], f'{key}.{fmt}')
+
+    def _remember(self, key, data):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _read_disk(self, key, fmt):
+        if self.directory is None:
+            return None
+        path = self._path(key, fmt)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)  # mtime serve de relógio LRU para a poda do disco
+            return data
+        except OSError:
+            return None
+
+    # Gravação atômica: outros processos nunca leem um arquivo pela metade
+    def _write_disk(self, key, fmt, data):
+        if self.directory is None:
+            return
+        path = self._path(key, fmt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune_disk()
+
+    # Remove os arquivos menos usados até o diretório caber em max_disk_bytes
+    def prune_disk(self):
+        if self.directory is not None:
+            prune_directory(self.directory, self.max_disk_bytes)
+
+    def get(self, key, fmt='png'):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._read_disk(key, fmt)
+        if data is not None:
+            self.hits += 1
+            self._remember(key, data)
+        else:
+            self.misses += 1
+        return data
+
+    def put(self, key, data, fmt='png'):
+        self._remember(key, data)
+        self._write_disk(key, fmt, data)
+
+    # Retorna a imagem do gráfico, desenhando-a apenas se ainda não estiver em cache
+    def get_or_render(self, spec, render=render_chart):
+        key = spec.key()
+        data = self.get(key, spec.fmt)
+        metrics.count('chart', 'miss' if data is None else 'hit')
+        if data is None:
+            data = render(spec)
+            self.put(key, data, spec.fmt)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Remove os arquivos menos usados (mtime mais antigo) até o diretório caber em max_bytes
+def prune_directory(directory, max_bytes):
+    if not os.path.isdir(directory):
+        return
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+# Instância única do processo, compartilhada por todas as sessões
+chart_cache = ChartCache()
+
+
+# Gráfico avulso de uma página: a falta vai para o pool de desenho, como em iter_charts,
+# em vez de ocupar a thread da sessão (importado aqui porque sdg.render usa este módulo)
+def get_chart(spec):
+    from sdg.render import render_many
+    return render_many([spec])[0]
@@ -0,0 +1,400 @@
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+from PIL import Image
+
+from sdg import metrics
+from sdg.radar import radar_factory
+
+# Incrementar sempre que o desenho mudar, para invalidar as imagens já em cache
+RENDER_VERSION = 2
+
+# Cor verde personalizada
+VERDE_CUSTOM = '#00A36C'
+
+# Disposição das figuras usadas pelas páginas: grade de portos e par porto/média.
+# `figsize` é a largura total e a altura de cada linha de subgráficos.
+LAYOUTS = {
+    'grid': dict(figsize=(18, 6), ncols=3, adjust=dict(wspace=0.25, hspace=0.35, top=0.85, bottom=0.1)),
+    'pair': dict(figsize=(12, 6), ncols=2, adjust=dict(wspace=0.5, top=0.85, bottom=0.15)),
+    'single': dict(figsize=(6, 6), ncols=1, adjust=dict(top=0.85, bottom=0.15)),
+}
+
+# Estilo da linha e do preenchimento de cada tipo de série
+STYLES = {
+    'port': (dict(color=VERDE_CUSTOM, linewidth=2), dict(color=VERDE_CUSTOM, alpha=0.5)),
+    'average': (dict(color='gray', linewidth=2, linestyle='--'), dict(color='gray', alpha=0.2)),
+}
+
+# Séries de outros períodos sobrepostas ao radar (tendência): só a linha, sem preenchimento
+OVERLAY_COLORS = ('#1f77b4', '#ff7f0e', '#9467bd', '#8c564b', '#e377c2')
+OVERLAY_STYLE = dict(linewidth=1.5, linestyle=':')
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# 'matplotlib' usa RadarAxes; 'svg' gera o SVG diretamente com NumPy (sdg/svg.py)
+RENDERERS = ('matplotlib', 'svg')
+
+
+class Panel(NamedTuple):
+    title: str
+    values: tuple
+    style: str = 'port'
+    overlays: tuple = ()  # pares (rótulo, valores) de outros períodos
+
+
+class ChartSpec(NamedTuple):
+    layout: str        # chave de LAYOUTS
+    labels: tuple      # rótulos dos eixos do radar (ITEM_AJUST ou TEMA)
+    panels: tuple      # um Panel por subgráfico
+    frame: str = 'polygon'
+    fmt: str = 'png'
+    renderer: str = 'matplotlib'
+
+    # Hash do conteúdo (dados + parâmetros de desenho) usado como chave de cache
+    def key(self):
+        payload = json.dumps({
+            'version': RENDER_VERSION,
+            'layout': LAYOUTS[self.layout],
+            'labels': self.labels,
+            # Painéis sem sobreposição mantêm a chave que tinham antes dela existir
+            'panels': [panel if panel.overlays else panel[:3] for panel in self.panels],
+            'frame': self.frame,
+            'fmt': self.fmt,
+            'renderer': self.renderer,
+        }, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _floats(values):
+    return tuple(float(v) for v in np.asarray(values, dtype=float))
+
+
+# Monta um Panel a partir de uma série/array de valores (e das séries sobrepostas)
+def make_panel(title, values, style='port', overlays=()):
+    return Panel(str(title), _floats(values), style,
+                 tuple((str(label), _floats(series)) for label, series in overlays))
+
+
+def make_spec(layout, labels, panels, frame='polygon', fmt='png', renderer='matplotlib'):
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown layout: %s" % layout)
+    if renderer not in RENDERERS:
+        raise ValueError("Unknown renderer: %s" % renderer)
+    if renderer == 'svg':
+        fmt = 'svg'
+    if fmt not in FORMATS:
+        raise ValueError("Unknown image format: %s" % fmt)
+    return ChartSpec(layout, tuple(str(label) for label in labels), tuple(panels), frame, fmt, renderer)
+
+
+# Figuras ociosas guardadas para reaproveitamento, no máximo FIGURE_POOL_SIZE por processo
+FIGURE_POOL_SIZE = 8
+
+# Resolução das imagens e margem da caixa justa (a mesma do savefig com bbox_inches='tight')
+DPI = 200
+PAD_INCHES = 0.1
+
+# Fundos estáticos já rasterizados, um LRU por processo limitado em bytes (0 desativa);
+# os processos de desenho (sdg/render.py) dividem o limite entre si
+BACKGROUND_CACHE_MB = float(os.environ.get('SDG_BACKGROUND_CACHE_MB', 128))
+
+
+# Número de série de cada RadarFigure: um fundo só vale para a figura que o desenhou (o draw
+# também ajusta a posição dos eixos polares, que uma figura nova ainda não tem)
+_serials = itertools.count()
+
+
+# Camada estática de uma figura (moldura, grade, raios e rótulos), sem as séries nem os títulos
+class Background(NamedTuple):
+    region: object   # BufferRegion do Agg só com a caixa dos artistas estáticos
+    bbox: Bbox       # caixa justa dos artistas estáticos, em pixels
+    titles: tuple    # altura dos títulos (coordenadas dos eixos) ajustada pelo draw
+    nbytes: int
+
+
+# Figura orientada a objetos (sem o gerenciador global do pyplot) cujos eixos, linhas e
+# preenchimentos são criados uma vez e depois só recebem novos dados. As séries, os títulos
+# e as legendas são "animados": o fundo estático é rasterizado uma vez por combinação de
+# rótulos e limites radiais, e cada PNG é esse fundo com só os polígonos desenhados por cima.
+class RadarFigure:
+    def __init__(self, layout, radar, nrows):
+        settings = LAYOUTS[layout]
+        width, row_height = settings['figsize']
+        self.serial = next(_serials)
+        self.radar = radar
+        self.figure = Figure(figsize=(width, row_height * nrows), dpi=DPI)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.figure.subplots_adjust(**settings['adjust'])
+        axs = self.figure.subplots(nrows=nrows, ncols=settings['ncols'],
+                                   subplot_kw=dict(projection=radar.name), squeeze=False)
+        self.axes = list(axs.ravel())
+        self.lines = []
+        self.fills = []
+        self.overlays = [[] for _ in self.axes]
+        zeros = np.zeros(radar.num_vars)
+        for ax in self.axes:
+            ax.grid(True, which='major', axis='x', color='gray', linestyle='-', linewidth=0.5)
+            self.lines.append(ax.plot(radar.theta, zeros, animated=True)[0])
+            self.fills.append(ax.fill(radar.theta, zeros, animated=True)[0])
+            ax.title.set_animated(True)
+        self._labels = None
+        self._count = 0
+
+    def update(self, spec):
+        theta = np.append(self.radar.theta, self.radar.theta[0])
+        labels_changed = spec.labels != self._labels
+        for index, ax in enumerate(self.axes):
+            visible = index < len(spec.panels)
+            ax.set_visible(visible)
+            if not visible:
+                continue
+            panel = spec.panels[index]
+            line_style, fill_style = STYLES[panel.style]
+            values = np.asarray(panel.values, dtype=float)
+
+            self.lines[index].set_data(theta, np.append(values, values[0]))
+            self.lines[index].set(**{'linestyle': '-', **line_style})
+            self.fills[index].set_xy(np.column_stack([self.radar.theta, values]))
+            self.fills[index].set(**fill_style)
+            self._update_overlays(index, panel, theta)
+
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+            if labels_changed:
+                ax.set_varlabels(spec.labels, fontsize=10)
+            ax.set_title(panel.title, weight='bold', size='medium', position=(0.5, 1.1), horizontalalignment='center')
+            ax.set_rgrids(range(0, 4), labels=["0", "1", "2", "3"], angle=0, fontsize=8)
+        self._labels = spec.labels
+        self._count = len(spec.panels)
+
+    # Linhas sobrepostas são criadas sob demanda e ficam ocultas quando não usadas
+    def _update_overlays(self, index, panel, theta):
+        ax = self.axes[index]
+        lines = self.overlays[index]
+        while len(lines) < len(panel.overlays):
+            lines.append(ax.plot(theta, np.zeros(len(theta)), animated=True, **OVERLAY_STYLE)[0])
+        for position, line in enumerate(lines):
+            if position >= len(panel.overlays):
+                line.set_visible(False)
+                continue
+            label, series = panel.overlays[position]
+            series = np.asarray(series, dtype=float)
+            line.set_data(theta, np.append(series, series[0]))
+            line.set(visible=True, label=label, color=OVERLAY_COLORS[position % len(OVERLAY_COLORS)])
+
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if panel.overlays:
+            legend = ax.legend(handles=lines[:len(panel.overlays)], loc='upper right', bbox_to_anchor=(1.3, 1.1),
+                               fontsize=8)
+            legend.set_animated(True)
+
+    # Artistas que mudam a cada gráfico: séries (dentro dos eixos) e textos (título e legenda)
+    def _series(self, index):
+        return [self.fills[index], self.lines[index]] + [line for line in self.overlays[index] if line.get_visible()]
+
+    def _texts(self, index):
+        ax = self.axes[index]
+        return [ax.title] + ([ax.get_legend()] if ax.get_legend() is not None else [])
+
+    # Rasteriza o fundo (o canvas.draw do Agg ignora os artistas animados) e mede a sua
+    # caixa justa com os títulos e legendas ocultos. O draw sobe cada título acima dos
+    # rótulos dos eixos; essa altura só depende do fundo e é guardada com ele.
+    def _draw_background(self):
+        self.canvas.draw()
+        renderer = self.canvas.get_renderer()
+        titles = tuple(self.axes[index].title.get_position()[1] for index in range(self._count))
+        hidden = [artist for index in range(self._count) for artist in self._texts(index)]
+        for artist in hidden:
+            artist.set_visible(False)
+        try:
+            bbox = self.figure.get_tightbbox(renderer).transformed(self.figure.dpi_scale_trans)
+        finally:
+            for artist in hidden:
+                artist.set_visible(True)
+        # Guarda só os pixels dos artistas estáticos (eixos, grade e rótulos), não o canvas
+        # inteiro; o resto da imagem é o fundo branco da figura
+        width, height = self.canvas.get_width_height()
+        crop = Bbox.from_extents(max(0, np.floor(bbox.x0)), max(0, np.floor(bbox.y0)),
+                                 min(width, np.ceil(bbox.x1)), min(height, np.ceil(bbox.y1)))
+        region = self.canvas.copy_from_bbox(crop)
+        return Background(region, bbox, titles, int(crop.width) * int(crop.height) * 4)
+
+    def _background(self):
+        key = (self.serial, self._labels, tuple(ax.get_ylim() for ax in self.axes[:self._count]))
+        background = _backgrounds.get(key)
+        metrics.count('background', 'miss' if background is None else 'hit')
+        if background is None:
+            background = self._draw_background()
+            _backgrounds.put(key, background)
+        return background
+
+    # PNG a partir do fundo em cache: só as séries, títulos e legendas são desenhados
+    def _composite_png(self):
+        background = self._background()
+        # O fundo guardado cobre só os artistas estáticos: o resto do canvas (títulos e
+        # legendas do gráfico anterior, ou um renderer recriado pelo savefig) volta ao branco
+        np.asarray(self.canvas.buffer_rgba())[...] = 255
+        self.canvas.restore_region(background.region)
+        renderer = self.canvas.get_renderer()
+        extents = [background.bbox]
+        for index in range(self._count):
+            ax = self.axes[index]
+            ax.title.set_y(background.titles[index])
+            for artist in self._series(index) + self._texts(index):
+                ax.draw_artist(artist)
+            extents.extend(artist.get_window_extent(renderer) for artist in self._texts(index))
+
+        bbox = Bbox.union(extents).padded(PAD_INCHES * DPI)
+        width, height = self.canvas.get_width_height()
+        if bbox.x0 < 0 or bbox.y0 < 0 or bbox.x1 > width or bbox.y1 > height:
+            return None  # legenda além da borda da figura: o savefig amplia a imagem
+        # Mesmo tamanho que o savefig daria (largura e altura truncadas)
+        left, top = round(bbox.x0), height - round(bbox.y1)
+        # A figura é opaca: o PNG em RGB é menor e mais rápido de comprimir que em RGBA
+        pixels = np.asarray(self.canvas.buffer_rgba())[top:top + int(bbox.height), left:left + int(bbox.width), :3]
+        buffer = io.BytesIO()
+        Image.fromarray(np.ascontiguousarray(pixels)).save(buffer, format='png', dpi=(DPI, DPI))
+        return buffer.getvalue()
+
+    def encode(self, fmt):
+        if fmt == 'png':
+            image = self._composite_png()
+            if image is not None:
+                return image
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format=fmt, bbox_inches='tight', pad_inches=PAD_INCHES, dpi=DPI)
+        return buffer.getvalue()
+
+    # Libera artistas, eixos e os fundos desta figura de forma determinística
+    def close(self):
+        _backgrounds.discard(self.serial)
+        self.figure.clear()
+        self.axes = self.lines = self.fills = self.overlays = []
+
+
+# Pool de figuras do processo. O Streamlit cria uma thread nova a cada rerun, então as
+# figuras não podem ficar presas à thread que as criou: cada desenho retira uma figura
+# ociosa do pool (ou cria outra) e a devolve no fim. Duas threads nunca desenham na mesma
+# figura (e canvas), não há estado do pyplot e as fontes do matplotlib são abertas por
+# thread, então não há trava global de desenho; com o pool de processos (sdg/render.py) no
+# ar, as páginas nem desenham na própria thread.
+_idle = OrderedDict()   # serial -> (chave, RadarFigure), da menos à mais recente
+_idle_lock = threading.Lock()
+
+
+# Fundos de todas as figuras do processo, por (serial da figura, rótulos, limites radiais):
+# um único LRU com um único limite em bytes, compartilhado pelas threads (e reruns)
+class BackgroundCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            background = self._entries.get(key)
+            if background is not None:
+                self._entries.move_to_end(key)
+            return background
+
+    def put(self, key, background):
+        limit = BACKGROUND_CACHE_MB * 2**20
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            if background.nbytes > limit:
+                return
+            self._entries[key] = background
+            self._size += background.nbytes
+            while self._size > limit:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.nbytes
+
+    # Remove os fundos de uma figura (que está sendo fechada)
+    def discard(self, serial):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == serial]:
+                self._size -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_backgrounds = BackgroundCache()
+
+
+# Retira do pool a figura ociosa mais recente com a mesma disposição, ou cria uma nova
+def _checkout(spec):
+    ncols = LAYOUTS[spec.layout]['ncols']
+    nrows = max(1, -(-len(spec.panels) // ncols))
+    key = (spec.layout, len(spec.labels), spec.frame, nrows)
+    with _idle_lock:
+        for serial, (idle_key, figure) in reversed(_idle.items()):
+            if idle_key == key:
+                del _idle[serial]
+                return key, figure
+    return key, RadarFigure(spec.layout, radar_factory(len(spec.labels), frame=spec.frame), nrows)
+
+
+# Devolve a figura ao pool; as ociosas além de FIGURE_POOL_SIZE são fechadas (LRU)
+def _checkin(key, figure):
+    evicted = []
+    with _idle_lock:
+        _idle[figure.serial] = (key, figure)
+        while len(_idle) > FIGURE_POOL_SIZE:
+            evicted.append(_idle.popitem(last=False)[1][1])
+    for figure in evicted:
+        figure.close()
+
+
+# Fecha todas as figuras ociosas do processo e descarta todos os fundos
+def release_figures():
+    with _idle_lock:
+        figures = [figure for _, figure in _idle.values()]
+        _idle.clear()
+    for figure in figures:
+        figure.close()
+    _backgrounds.clear()
+
+
+# Desenha a figura descrita por `spec` e retorna a imagem codificada (PNG ou SVG)
+def render_chart(spec):
+    if spec.renderer == 'svg':
+        from sdg.svg import render_svg
+        with metrics.span('draw_svg'):
+            return render_svg(spec)
+
+    key, figure = _checkout(spec)
+    try:
+        with metrics.span('draw'):
+            figure.update(spec)
+        with metrics.span('encode'):
+            image = figure.encode(spec.fmt)
+    except Exception:
+        figure.close()
+        raise
+    _checkin(key, figure)
+    return image
@@ -0,0 +1,89 @@
+# Vários gráficos em uma única imagem (pequenos múltiplos): os pares porto/média de todos os
+# portos da página ou os temas abertos de um porto, em vez de uma imagem por gráfico. Cada
+# gráfico continua no cache com a sua própria chave; a composição só cola as imagens em uma
+# grade e também fica em cache, pela lista das chaves.
+import hashlib
+import io
+import json
+import re
+
+import numpy as np
+from PIL import Image
+
+from sdg import metrics
+from sdg.cache import chart_cache
+from sdg.charts import DPI, RENDER_VERSION
+from sdg.render import render_many
+
+# Espaço entre as imagens, em pixels (PNG) ou pontos (SVG)
+GAP = 20
+
+_VIEWBOX = re.compile(rb"viewBox='([-\d.]+) ([-\d.]+) ([-\d.]+) ([-\d.]+)'")
+_DEFS = re.compile(rb"<defs>(.*?)</defs>", re.S)
+_GROUP = re.compile(rb"<g id='[^']+'>.*?</g>", re.S)
+
+
+# Posição de cada célula: largura de cada coluna e altura de cada linha pela maior imagem
+def _grid(sizes, columns):
+    widths = [max(w for w, _ in sizes[col::columns]) for col in range(min(columns, len(sizes)))]
+    heights = [max(h for _, h in sizes[row:row + columns]) for row in range(0, len(sizes), columns)]
+    xs = np.concatenate([[0], np.cumsum(np.add(widths, GAP))])
+    ys = np.concatenate([[0], np.cumsum(np.add(heights, GAP))])
+    cells = [(xs[i % columns] + (widths[i % columns] - w) / 2, ys[i // columns]) for i, (w, _) in enumerate(sizes)]
+    return cells, xs[-1] - GAP, ys[-1] - GAP
+
+
+def compose_png(images, columns=1):
+    decoded = [Image.open(io.BytesIO(image)).convert('RGB') for image in images]
+    cells, width, height = _grid([image.size for image in decoded], columns)
+    canvas = Image.new('RGB', (int(width), int(height)), 'white')
+    for image, (x, y) in zip(decoded, cells):
+        canvas.paste(image, (int(x), int(y)))
+    buffer = io.BytesIO()
+    canvas.save(buffer, format='png', dpi=(DPI, DPI))
+    return buffer.getvalue()
+
+
+# Cada SVG vira um <svg> aninhado; os fundos em <defs> (sdg/svg.py) têm nomes derivados do
+# conteúdo, então os repetidos entre os gráficos são definidos uma única vez
+def compose_svg(images, columns=1):
+    boxes = [tuple(float(v) for v in _VIEWBOX.search(image).groups()) for image in images]
+    cells, width, height = _grid([(w, h) for _, _, w, h in boxes], columns)
+    defs, body = {}, []
+    for image, (left, top, w, h), (x, y) in zip(images, boxes, cells):
+        for group in _GROUP.findall(b''.join(_DEFS.findall(image))):
+            defs.setdefault(group, None)
+        inner = _DEFS.sub(b'', image[image.index(b'>') + 1:image.rindex(b'</svg>')])
+        body.append(f"<svg x='{x:.1f}' y='{y:.1f}' width='{w:.0f}' height='{h:.0f}' "
+                    f"viewBox='{left:.0f} {top:.0f} {w:.0f} {h:.0f}'>".encode('utf-8') + inner + b"</svg>")
+    return (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width:.0f} {height:.0f}' "
+        f"font-family='DejaVu Sans, sans-serif'><defs>".encode('utf-8') + b''.join(defs) + b"</defs>"
+        + b''.join(body) + b"</svg>"
+    )
+
+
+COMPOSERS = {'png': compose_png, 'svg': compose_svg}
+
+
+def composite_key(specs, columns):
+    payload = json.dumps([RENDER_VERSION, 'composite', columns, [spec.key() for spec in specs]])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Imagem única com os gráficos de `specs` em `columns` colunas, na ordem dada
+def get_composite(specs, columns=1, cache=chart_cache):
+    specs = list(specs)
+    formats = {spec.fmt for spec in specs}
+    if len(formats) != 1:
+        raise ValueError("Composite charts need specs of a single image format")
+    fmt = formats.pop()
+    key = composite_key(specs, columns)
+    image = cache.get(key, fmt)
+    metrics.count('composite', 'miss' if image is None else 'hit')
+    if image is None:
+        images = render_many(specs, cache)
+        with metrics.span('compose'):
+            image = COMPOSERS[fmt](images, columns)
+        cache.put(key, image, fmt)
+    return image
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from sdg import metrics
+from sdg.groups import GroupIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PATH = os.environ.get('SDG_BASE_PATH', os.path.join(ROOT, 'BASE.csv'))
+
+# Colunas descritivas; todas as demais colunas numéricas são notas de portos
+COLUNAS_META = ['QUESTAO', 'TEMA', 'AREA', 'EIXO', 'ITEM', 'ITEM_AJUST', 'MEDIA']
+CATEGORICAS = ['TEMA', 'AREA', 'EIXO']
+
+# Com copy-on-write as páginas recebem visões do mesmo DataFrame; qualquer escrita gera cópia local
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class Dataset(NamedTuple):
+    df: pd.DataFrame          # BASE.csv com MEDIA, categóricas e notas em int8
+    ports: list               # colunas de nota dos portos
+    temas: list               # temas na ordem do arquivo
+    tema_means: pd.DataFrame  # média de cada porto (e da MEDIA) por TEMA
+    path: str
+    version: str              # hash do conteúdo do arquivo
+    groups: GroupIndex        # TEMA -> AREA -> linhas, rótulos ITEM_AJUST e N
+
+
+# Instância atual de cada caminho, compartilhada pelo processo inteiro, junto com a
+# assinatura (mtime, tamanho) do arquivo de onde veio
+_datasets = {}
+_lock = threading.Lock()
+
+
+# Menor tipo que representa as notas sem perda (int8 para a escala 0-3), em um único bloco 2D
+def _compact_scores(scores):
+    values = scores.to_numpy(dtype=np.float64)
+    if np.isnan(values).any():
+        compact = values.astype(np.float32)
+    elif np.array_equal(values, np.round(values)) and values.min() >= -128 and values.max() <= 127:
+        compact = values.astype(np.int8)
+    else:
+        compact = values.astype(np.float32)
+    return pd.DataFrame(compact, columns=scores.columns, index=scores.index)
+
+
+# Descobre as colunas de portos a partir do próprio arquivo, na ordem em que aparecem
+def discover_ports(df):
+    return [coluna for coluna in df.columns
+            if coluna not in COLUNAS_META and pd.api.types.is_numeric_dtype(df[coluna])]
+
+
+# Média de todos os portos em uma única operação sobre a matriz de notas
+def port_average(scores):
+    values = scores.to_numpy(dtype=np.float32)
+    if np.isnan(values).any():
+        return np.nanmean(values, axis=1)
+    return values.mean(axis=1)
+
+
+def _as_categorical(series):
+    return pd.Categorical(series, categories=pd.unique(series.dropna()))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Lê e compacta BASE.csv, sem as colunas derivadas (MEDIA e médias por TEMA)
+def _parse(path):
+    with metrics.span('parse_csv'):
+        df = pd.read_csv(path, delimiter=';')
+    ports = discover_ports(df)
+    meta = [coluna for coluna in df.columns if coluna not in ports]
+
+    # Um único bloco de notas compacto, mesmo com milhares de portos
+    df = pd.concat([df[meta], _compact_scores(df[ports])], axis=1)
+    for coluna in CATEGORICAS:
+        df[coluna] = _as_categorical(df[coluna])
+
+    # Formatar ITEM_AJUST com duas casas decimais
+    if pd.api.types.is_numeric_dtype(df['ITEM_AJUST']):
+        df['ITEM_AJUST'] = df['ITEM_AJUST'].map('{:.2f}'.format)
+    else:
+        df['ITEM_AJUST'] = df['ITEM_AJUST'].astype(str)
+    return df, ports
+
+
+def group_means(df, columns):
+    return df.groupby('TEMA', observed=True)[columns].mean().astype(np.float32)
+
+
+def read_base(path=BASE_PATH, version=None):
+    version = version or file_hash(path)
+    df, ports = _parse(path)
+
+    # Calcular a média de todos os portos
+    df['MEDIA'] = port_average(df[ports])
+
+    tema_means = group_means(df, ports + ['MEDIA']).reset_index()
+    temas = [str(tema) for tema in df['TEMA'].cat.categories]
+    return Dataset(df, ports, temas, tema_means, path, version, tema_index(df))
+
+
+def tema_index(df):
+    return GroupIndex(df, 'TEMA', 'AREA', label='ITEM_AJUST')
+
+
+# Linhas e portos cujas notas mudaram entre duas matrizes de mesmo formato
+def changed_cells(old, new):
+    old = old.to_numpy(dtype=np.float32)
+    new = new.to_numpy(dtype=np.float32)
+    changed = (old != new) & ~(np.isnan(old) & np.isnan(new))
+    return np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+
+
+# Aplica a nova versão do arquivo sobre o Dataset anterior. Com as mesmas linhas e portos,
+# recalcula a MEDIA só das linhas alteradas e as médias por TEMA só dos temas e portos
+# afetados; devolve None quando a estrutura mudou e é preciso recalcular tudo.
+def update_base(previous, path=BASE_PATH, version=None):
+    version = version or file_hash(path)
+    df, ports = _parse(path)
+    meta = [coluna for coluna in COLUNAS_META if coluna != 'MEDIA']
+    old = previous.df
+    if ports != previous.ports or len(df) != len(old) or not df[meta].equals(old[meta]):
+        return None
+
+    rows, columns = changed_cells(old[ports], df[ports])
+    media = old['MEDIA'].to_numpy().copy()
+    media[rows] = port_average(df[ports].iloc[rows])
+    df['MEDIA'] = media
+
+    tema_means = previous.tema_means
+    if len(rows):
+        affected = df['TEMA'].iloc[rows].unique()
+        columns = [ports[index] for index in columns] + ['MEDIA']
+        means = group_means(df[df['TEMA'].isin(affected)], columns)
+        positions = tema_means['TEMA'].isin(means.index).to_numpy()
+        tema_means = tema_means.copy()
+        tema_means.loc[positions, columns] = means.reindex(tema_means['TEMA'][positions]).to_numpy()
+    return previous._replace(df=df, tema_means=tema_means, version=version)
+
+
+def _reload(previous, path):
+    version = file_hash(path)
+    if previous is None:
+        return read_base(path, version)
+    if previous.version == version:
+        return previous  # só o mtime mudou
+    dataset = update_base(previous, path, version)
+    if dataset is None:
+        metrics.count('dataset', 'full_reload')
+        return read_base(path, version)
+    metrics.count('dataset', 'partial_reload')
+    return dataset
+
+
+# Carrega BASE.csv uma vez por processo; todas as sessões recebem o mesmo objeto até o
+# arquivo mudar, quando ele é atualizado de forma incremental para todas elas
+def load_dataset(path=BASE_PATH):
+    cached = _datasets.get(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        if cached is not None:
+            return cached[1]  # arquivo sendo substituído; mantém a versão anterior
+        raise
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if cached is not None and cached[0] == signature:
+        metrics.count('dataset', 'hit')
+        return cached[1]
+    with _lock:
+        cached = _datasets.get(path)
+        if cached is None or cached[0] != signature:
+            metrics.count('dataset', 'miss')
+            previous = cached[1] if cached is not None else None
+            try:
+                dataset = _reload(previous, path)
+            except (OSError, ValueError, KeyError):
+                # Arquivo ainda sendo gravado: fica com a versão anterior e tenta de novo depois
+                if previous is None:
+                    raise
+                return previous
+            cached = _datasets[path] = (signature, dataset)
+    return cached[1]
+
+
+# Resultados derivados de um Dataset (estatísticas por tema, semelhança entre portos), por
+# (caminho, nome, argumentos) junto com a versão de onde vieram: calculados uma vez por
+# versão e compartilhados por todas as sessões; uma nova versão substitui o anterior
+_derived = {}
+_derived_lock = threading.Lock()
+
+
+def derived(dataset, name, args, compute):
+    key = (dataset.path, name, args)
+    cached = _derived.get(key)
+    if cached is not None and cached[0] == dataset.version:
+        metrics.count(name, 'hit')
+        return cached[1]
+    with _derived_lock:
+        cached = _derived.get(key)
+        if cached is None or cached[0] != dataset.version:
+            metrics.count(name, 'miss')
+            cached = _derived[key] = (dataset.version, compute())
+    return cached[1]
@@ -0,0 +1,136 @@
+# Exportação das visões filtradas (tabela de atributos, fatia TEMA/AREA, estatísticas por
+# TEMA) em CSV, Parquet e Excel. As linhas são gravadas em blocos, lidos direto da fatia
+# exibida, sem outra cópia do DataFrame inteiro; cada arquivo fica em disco por (visão,
+# seleção, versão, formato) e a mesma exportação pedida de novo é só a leitura do arquivo.
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Callable, NamedTuple
+
+from sdg import metrics
+from sdg.cache import prune_directory
+from sdg.data import ROOT
+
+EXPORT_DIR = os.environ.get('SDG_EXPORT_DIR', os.path.join(ROOT, '.cache', 'exports'))
+EXPORT_DISK_MB = float(os.environ.get('SDG_EXPORT_CACHE_MB', 256))
+
+# Linhas por bloco gravado
+CHUNK_ROWS = 5000
+
+# Limite de linhas de uma planilha do Excel (com o cabeçalho); o restante segue em novas abas
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def iter_chunks(df, rows=CHUNK_ROWS):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+def write_csv(df, path):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        if df.empty:
+            df.to_csv(file, index=False)
+        for index, chunk in enumerate(iter_chunks(df)):
+            chunk.to_csv(file, index=False, header=index == 0)
+
+
+def write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# Modo write-only do openpyxl: cada linha vai direto para o XML da planilha, sem manter
+# as células em memória
+def write_excel(df, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    header = [str(coluna) for coluna in df.columns]
+    sheet, rows = None, EXCEL_MAX_ROWS
+    for chunk in iter_chunks(df):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if rows == EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Data ({len(workbook.worksheets) + 1})" if sheet else "Data")
+                sheet.append(header)
+                rows = 1
+            sheet.append(row)
+            rows += 1
+    if sheet is None:
+        workbook.create_sheet("Data").append(header)
+    workbook.save(path)
+
+
+class ExportFormat(NamedTuple):
+    label: str
+    suffix: str
+    mime: str
+    write: Callable
+
+
+FORMATS = {
+    'csv': ExportFormat("CSV", 'csv', 'text/csv', write_csv),
+    'parquet': ExportFormat("Parquet", 'parquet', 'application/vnd.apache.parquet', write_parquet),
+    'xlsx': ExportFormat("Excel", 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                         write_excel),
+}
+
+
+# Formatos disponíveis neste ambiente (Parquet só com o pyarrow instalado)
+def available_formats():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return [name for name in FORMATS if name != 'parquet']
+    return list(FORMATS)
+
+
+# Nome de arquivo seguro a partir das partes da seleção
+def file_name(*parts):
+    return '_'.join(re.sub(r'[^\w.-]+', '-', str(part)).strip('-') for part in parts)
+
+
+def export_key(view, selection, version, fmt):
+    payload = json.dumps([view, selection, version, fmt], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Caminho do arquivo exportado, gravando-o apenas se ainda não existir. `frame` é chamado só
+# nesse caso e deve devolver a fatia exibida (sem copiar); a gravação é atômica.
+def export_file(view, selection, version, fmt, frame, directory=EXPORT_DIR):
+    export = FORMATS[fmt]
+    path = os.path.join(directory, f'{export_key(view, selection, version, fmt)}.{export.suffix}')
+    try:
+        os.utime(path)  # mtime serve de relógio LRU para a poda
+        metrics.count('export', 'hit')
+        return path
+    except OSError:
+        metrics.count('export', 'miss')
+
+    # Poda antes de gravar, para que o novo arquivo nunca seja o removido
+    prune_directory(directory, EXPORT_DISK_MB * 2**20)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        with metrics.span('export'):
+            export.write(frame(), tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def export_bytes(view, selection, version, fmt, frame, directory=EXPORT_DIR):
+    with open(export_file(view, selection, version, fmt, frame, directory), 'rb') as file:
+        return file.read()
+
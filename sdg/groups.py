@@ -0,0 +1,62 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Group(NamedTuple):
+    rows: object    # slice (linhas contíguas) ou array de posições, na ordem do arquivo
+    labels: tuple   # rótulos distintos do grupo (ITEM_AJUST), na ordem em que aparecem
+    size: int       # número de rótulos distintos (N do radar)
+
+
+# Índice hierárquico de dois níveis (ex.: TEMA -> AREA) montado uma vez no carregamento,
+# para que as páginas leiam grupos já fatiados em vez de varrer o DataFrame a cada execução
+class GroupIndex:
+    def __init__(self, df, outer, inner, label=None):
+        self.outer = outer
+        self.inner = inner
+        self._groups = {}
+        self._children = {}
+        labels = df[label].to_numpy() if label is not None else None
+
+        for key, positions in self._positions(df, [outer]):
+            self._groups[key, None] = self._group(positions, labels)
+            self._children[key] = []
+        for (key, child), positions in self._positions(df, [outer, inner]):
+            self._groups[key, child] = self._group(positions, labels)
+            self._children[key].append(child)
+
+    # Posições das linhas de cada grupo em uma única passada, na ordem de aparição
+    @staticmethod
+    def _positions(df, keys):
+        indices = df.groupby(keys if len(keys) > 1 else keys[0], sort=False, observed=True).indices
+        return sorted(indices.items(), key=lambda item: item[1][0])
+
+    @staticmethod
+    def _group(positions, labels):
+        positions = np.asarray(positions)
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            rows = slice(int(positions[0]), int(positions[-1]) + 1)
+        else:
+            rows = positions
+        distinct = tuple(pd.unique(labels[positions])) if labels is not None else ()
+        return Group(rows, distinct, len(distinct))
+
+    def keys(self):
+        return list(self._children)
+
+    def children(self, key):
+        return list(self._children.get(key, ()))
+
+    # Grupo de `key` (todas as áreas se `child` for None ou "All"/"ALL")
+    def group(self, key, child=None):
+        if child in ("All", "ALL"):
+            child = None
+        return self._groups.get((key, child))
+
+    def frame(self, df, key, child=None):
+        group = self.group(key, child)
+        if group is None:
+            return df.iloc[0:0]
+        return df.iloc[group.rows]
@@ -0,0 +1,212 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Instrumentação desligada por padrão; SDG_METRICS=1 liga os spans, o log JSON e o arquivo Prometheus
+ENABLED = os.environ.get('SDG_METRICS', '').lower() not in ('', '0', 'false', 'no')
+METRICS_DIR = os.path.join(ROOT, '.cache', 'metrics')
+LOG_PATH = os.environ.get('SDG_METRICS_LOG', os.path.join(METRICS_DIR, 'events.jsonl'))
+PROMETHEUS_PATH = os.environ.get('SDG_METRICS_FILE', os.path.join(METRICS_DIR, 'metrics.prom'))
+
+
+# Tempos de uma execução de página (ou de um fragmento): fase -> [vezes, segundos],
+# na ordem em que cada fase termina pela primeira vez
+class Trace:
+    def __init__(self, page):
+        self.page = page
+        self.spans = {}
+        self.caches = defaultdict(lambda: {'hit': 0, 'miss': 0})
+        self.started = time.perf_counter()
+        self.total = None
+        self.status = 'ok'
+
+
+# Span nulo compartilhado: com a instrumentação desligada, `with span(...)` não aloca nada
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        phase = self.trace.spans.setdefault(self.name, [0, 0.0])
+        phase[0] += 1
+        phase[1] += elapsed
+        return False
+
+
+# Cada sessão do Streamlit roda o script em sua própria thread; o trace ativo é por thread
+_local = threading.local()
+_lock = threading.Lock()
+_phases = defaultdict(lambda: [0, 0.0])    # (page, phase) -> [count, sum]
+_caches = defaultdict(int)                 # (cache, result) -> total
+
+
+# Mede uma fase da execução atual (no-op sem trace ativo, inclusive nos workers do pool)
+def span(name):
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return NO_SPAN
+    return _Span(trace, name)
+
+
+# Conta um acerto ou falta de cache (result: 'hit' ou 'miss')
+def count(cache, result):
+    if not ENABLED:
+        return
+    with _lock:
+        _caches[cache, result] += 1
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.caches[cache][result] += 1
+
+
+# Para caches cujo acerto não é visível de fora (st.cache_data): conta um acerto
+# a menos que `miss(cache)` seja chamado dentro do bloco, na função cacheada
+@contextmanager
+def lookup(cache):
+    if not ENABLED:
+        yield
+        return
+    missed = getattr(_local, 'missed', None)
+    _local.missed = set()
+    try:
+        yield
+    finally:
+        count(cache, 'miss' if cache in _local.missed else 'hit')
+        _local.missed = missed
+
+
+def miss(cache):
+    if ENABLED and getattr(_local, 'missed', None) is not None:
+        _local.missed.add(cache)
+
+
+# Inicia o trace de uma execução de página. Um trace que ficou aberto na thread (página
+# interrompida por st.stop ou por uma exceção) é registrado antes, como interrompido.
+def begin(name):
+    if not ENABLED:
+        return None
+    previous = getattr(_local, 'trace', None)
+    if previous is not None:
+        previous.status = 'interrupted'
+        end(previous)
+    trace = _local.trace = Trace(name)
+    return trace
+
+
+def end(trace):
+    if trace is None:
+        return
+    if getattr(_local, 'trace', None) is trace:
+        _local.trace = None
+    trace.total = time.perf_counter() - trace.started
+    record(trace)
+
+
+# Trace de um bloco (fragmento); dentro de outro trace, na execução completa da página,
+# vira apenas um span do trace externo
+@contextmanager
+def page(name):
+    outer = getattr(_local, 'trace', None)
+    if outer is not None:
+        with _Span(outer, name):
+            yield outer
+        return
+
+    trace = begin(name)
+    try:
+        yield trace
+    except BaseException as error:
+        # st.stop e st.rerun também chegam aqui como exceções de controle
+        if trace is not None:
+            trace.status = type(error).__name__
+        raise
+    finally:
+        end(trace)
+
+
+def record(trace):
+    with _lock:
+        for name, (_, seconds) in [*trace.spans.items(), ('total', (1, trace.total))]:
+            phase = _phases[trace.page, name]
+            phase[0] += 1
+            phase[1] += seconds
+        try:
+            _append_log(trace)
+            _write_prometheus()
+        except OSError:
+            pass
+
+
+def _append_log(trace):
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    event = {
+        'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'page': trace.page,
+        'status': trace.status,
+        'total_s': round(trace.total, 6),
+        'spans': [{'name': name, 'count': calls, 'seconds': round(seconds, 6)}
+                  for name, (calls, seconds) in trace.spans.items()],
+        'caches': dict(trace.caches),
+    }
+    with open(LOG_PATH, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    lines = [
+        '# HELP sdg_phase_seconds Time spent in each page phase.',
+        '# TYPE sdg_phase_seconds summary',
+    ]
+    for (page_name, phase), (total_count, total_sum) in sorted(_phases.items()):
+        labels = f'page="{_label(page_name)}",phase="{_label(phase)}"'
+        lines.append(f'sdg_phase_seconds_sum{{{labels}}} {total_sum:.6f}')
+        lines.append(f'sdg_phase_seconds_count{{{labels}}} {total_count}')
+    lines += [
+        '# HELP sdg_cache_requests_total Cache lookups by cache and result.',
+        '# TYPE sdg_cache_requests_total counter',
+    ]
+    for (cache, result), total in sorted(_caches.items()):
+        lines.append(f'sdg_cache_requests_total{{cache="{_label(cache)}",result="{result}"}} {total}')
+    return '\n'.join(lines) + '\n'
+
+
+# Regravado de forma atômica a cada execução, para ser lido pelo textfile collector do node_exporter
+def _write_prometheus():
+    directory = os.path.dirname(PROMETHEUS_PATH)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(prometheus_text())
+        os.replace(tmp_path, PROMETHEUS_PATH)
+    except OSError:
+        os.remove(tmp_path)
+        raise
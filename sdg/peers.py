@@ -0,0 +1,161 @@
+# Semelhança entre portos: vizinhos mais próximos, rankings e agrupamentos (k-means) sobre
+# as notas de todos os indicadores. As distâncias são calculadas em blocos de linhas, para
+# que a memória cresça com o número de portos e não com o seu quadrado, e os resultados
+# ficam guardados por versão do Dataset (data.derived).
+import numpy as np
+import pandas as pd
+
+from sdg.data import derived
+
+# Escopos de comparação além de um tema específico
+ALL_ITEMS = "All indicators"
+TEMA_MEANS = "SDG means"
+
+# Elementos por bloco da matriz de distâncias (linhas do bloco x portos), ~32 MB em float64
+BLOCK_ELEMENTS = 1 << 22
+
+
+def scopes(dataset):
+    return [ALL_ITEMS, TEMA_MEANS] + list(dataset.temas)
+
+
+# Matriz portos x variáveis do escopo (indicadores, médias por tema ou indicadores de um tema).
+# Notas ausentes recebem a média do indicador, para não afastar portos sem avaliação no item.
+def peer_features(dataset, scope=ALL_ITEMS):
+    if scope == TEMA_MEANS:
+        values = dataset.tema_means[dataset.ports].to_numpy(dtype=np.float64)
+    elif scope == ALL_ITEMS:
+        values = dataset.df[dataset.ports].to_numpy(dtype=np.float64)
+    else:
+        values = dataset.groups.frame(dataset.df, scope)[dataset.ports].to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    if missing.any():
+        means = np.nanmean(np.where(missing.all(axis=1, keepdims=True), 0, values), axis=1)
+        values = np.where(missing, means[:, None], values)
+    return np.ascontiguousarray(values.T)
+
+
+def _block_rows(count, chunk=None):
+    return chunk or max(1, BLOCK_ELEMENTS // max(count, 1))
+
+
+# Distâncias quadradas de um bloco de linhas a todas as linhas: |a|² + |b|² - 2ab
+def _squared_distances(block, matrix, norms, block_norms):
+    squared = block_norms[:, None] + norms[None, :] - 2 * (block @ matrix.T)
+    return np.maximum(squared, 0, out=squared)
+
+
+# Os k vizinhos mais próximos de cada linha (sem ela mesma), em ordem de distância.
+# A distância é a diferença quadrática média por variável, na escala das notas.
+def nearest_peers(matrix, k, chunk=None):
+    count, variables = matrix.shape
+    k = min(k, count - 1)
+    indices = np.empty((count, max(k, 0)), dtype=np.int64)
+    distances = np.empty((count, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return indices, distances
+
+    norms = np.einsum('ij,ij->i', matrix, matrix)
+    rows = _block_rows(count, chunk)
+    for start in range(0, count, rows):
+        stop = min(start + rows, count)
+        squared = _squared_distances(matrix[start:stop], matrix, norms, norms[start:stop])
+        own = np.arange(stop - start)
+        squared[own, start + own] = np.inf
+        nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+        nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_squared, axis=1, kind='stable')
+        indices[start:stop] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:stop] = np.sqrt(np.take_along_axis(nearest_squared, order, axis=1) / max(variables, 1))
+    return indices, distances
+
+
+# k-means com inicialização k-means++ determinística; a atribuição aos centros é feita em
+# blocos de linhas, como as distâncias entre portos
+def kmeans(matrix, clusters, iterations=50, seed=0, chunk=None):
+    count = len(matrix)
+    clusters = max(1, min(clusters, count))
+    rng = np.random.default_rng(seed)
+    norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    # Distância de cada linha a um centro sem materializar (linhas x variáveis) temporários
+    def distance_to(center):
+        return np.maximum(norms + center @ center - 2 * (matrix @ center), 0)
+
+    centers = np.empty((clusters, matrix.shape[1]))
+    centers[0] = matrix[rng.integers(count)]
+    closest = distance_to(centers[0])
+    for index in range(1, clusters):
+        total = closest.sum()
+        chosen = rng.choice(count, p=closest / total) if total > 0 else rng.integers(count)
+        centers[index] = matrix[chosen]
+        np.minimum(closest, distance_to(centers[index]), out=closest)
+
+    labels = np.full(count, -1, dtype=np.int64)
+    rows = _block_rows(clusters, chunk)
+    for _ in range(iterations):
+        center_norms = np.einsum('ij,ij->i', centers, centers)
+        assigned = np.empty(count, dtype=np.int64)
+        for start in range(0, count, rows):
+            stop = min(start + rows, count)
+            assigned[start:stop] = _squared_distances(matrix[start:stop], centers, center_norms,
+                                                      norms[start:stop]).argmin(axis=1)
+        if np.array_equal(assigned, labels):
+            break
+        labels = assigned
+        # Novos centros: médias dos membros, via produto com a matriz de pertinência (grupos x linhas)
+        members = np.zeros((clusters, count))
+        members[labels, np.arange(count)] = 1
+        sizes = members.sum(axis=1)
+        filled = sizes > 0
+        centers[filled] = (members @ matrix)[filled] / sizes[filled, None]
+    return labels, centers
+
+
+# Vizinhos de todos os portos em formato longo: PORT, RANK (1 = mais próximo), PEER, DISTANCE
+def peer_table(dataset, k=5, scope=ALL_ITEMS):
+    def compute():
+        indices, distances = nearest_peers(peer_features(dataset, scope), k)
+        ports = np.asarray(dataset.ports, dtype=object)
+        count, found = indices.shape
+        return pd.DataFrame({
+            'PORT': np.repeat(ports, found),
+            'RANK': np.tile(np.arange(1, found + 1), count),
+            'PEER': ports[indices.reshape(-1)],
+            'DISTANCE': distances.reshape(-1),
+        })
+    return derived(dataset, 'peer_table', (k, scope), compute)
+
+
+def port_peers(dataset, port, k=5, scope=ALL_ITEMS):
+    table = peer_table(dataset, k, scope)
+    return table[table['PORT'] == port].reset_index(drop=True)
+
+
+# Posição de cada porto (1 = maior nota média) no geral e em cada tema, em uma única
+# operação sobre a tabela de médias
+def rankings(dataset):
+    def compute():
+        means = dataset.tema_means.set_index(dataset.tema_means['TEMA'].astype(str))[dataset.ports].T
+        means.insert(0, 'Overall', dataset.df[dataset.ports].mean().astype(np.float32))
+        ranks = means.rank(axis=0, ascending=False, method='min').astype('Int64')
+        ranks.index.name = 'PORT'
+        ranks.columns.name = None
+        return ranks.sort_values('Overall', kind='stable')
+    return derived(dataset, 'rankings', (), compute)
+
+
+# Grupo de cada porto; os grupos são numerados pela nota média do centro (1 = maior)
+def port_clusters(dataset, clusters=4, scope=ALL_ITEMS):
+    def compute():
+        matrix = peer_features(dataset, scope)
+        labels, centers = kmeans(matrix, clusters)
+        order = np.argsort(-centers.mean(axis=1), kind='stable')
+        number = np.empty_like(order)
+        number[order] = np.arange(1, len(order) + 1)
+        return pd.DataFrame({
+            'PORT': dataset.ports,
+            'CLUSTER': number[labels],
+            'SCORE': matrix.mean(axis=1).astype(np.float32),
+        }).sort_values(['CLUSTER', 'SCORE'], ascending=[True, False], kind='stable').reset_index(drop=True)
+    return derived(dataset, 'port_clusters', (clusters, scope), compute)
@@ -0,0 +1,203 @@
+# Avaliações de vários períodos em formato longo (período, item, porto, nota), particionadas
+# por período em disco para que cada página carregue só os períodos que exibe.
+#
+#     python -m sdg.periods import 2023 --data BASE_2023.csv
+#     python -m sdg.periods list
+import argparse
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sdg.data import (BASE_PATH, ROOT, Dataset, group_means, load_dataset, port_average, read_base,
+                      tema_index)
+from sdg.stats import MEAN, tema_statistic
+
+PERIODS_DIR = os.environ.get('SDG_PERIODS_DIR', os.path.join(ROOT, 'periods'))
+
+# Período "atual": o próprio BASE.csv, sempre disponível
+CURRENT = 'Current'
+
+# Colunas que identificam um item (indicador) e chave de alinhamento entre períodos
+ITEM_COLUMNS = ['QUESTAO', 'TEMA', 'AREA', 'EIXO', 'ITEM', 'ITEM_AJUST']
+ITEM_KEY = ['TEMA', 'ITEM_AJUST']
+
+# Partições já lidas, por caminho, com a assinatura (mtime, tamanho) do arquivo
+_partitions = {}
+_lock = threading.Lock()
+
+
+# BASE no formato longo: uma linha por (item, porto), chaves categóricas e nota compacta
+def to_long(dataset, period):
+    df, ports = dataset.df, dataset.ports
+    rows, count = len(df), len(ports)
+    scores = df[ports].to_numpy()
+    item = np.repeat(np.arange(rows), count)
+    long = {'PERIOD': pd.Categorical.from_codes(np.zeros(rows * count, dtype=np.int8), [str(period)])}
+    for coluna in ITEM_COLUMNS:
+        values = pd.Categorical(df[coluna])
+        long[coluna] = pd.Categorical.from_codes(values.codes[item], values.categories)
+    long['PORT'] = pd.Categorical.from_codes(np.tile(np.arange(count), rows), ports)
+    long['SCORE'] = scores.reshape(-1)
+    return pd.DataFrame(long)
+
+
+# Reconstrói o Dataset (formato largo das páginas) a partir do formato longo de um período
+def from_long(long, path, version):
+    items = long[ITEM_COLUMNS].drop_duplicates(ITEM_KEY)
+    keys = pd.MultiIndex.from_frame(long[ITEM_KEY].astype(str))
+    row = pd.MultiIndex.from_frame(items[ITEM_KEY].astype(str)).get_indexer(keys)
+    ports = [str(port) for port in long['PORT'].cat.remove_unused_categories().cat.categories]
+    column = pd.Index(ports).get_indexer(long['PORT'].astype(str))
+
+    # Mantém o tipo da nota só quando toda célula (item, porto) existe e está preenchida; do
+    # contrário as que faltam ficam NaN (e não zero, como ficariam em uma matriz de inteiros)
+    complete = len(long) == len(items) * len(ports) and long['SCORE'].notna().all()
+    if complete:
+        scores = np.empty((len(items), len(ports)), dtype=long['SCORE'].dtype)
+    else:
+        scores = np.full((len(items), len(ports)), np.nan, dtype=np.float32)
+    scores[row, column] = long['SCORE'].to_numpy()
+
+    df = items.reset_index(drop=True)
+    for coluna in ['TEMA', 'AREA', 'EIXO']:
+        df[coluna] = pd.Categorical(df[coluna].astype(str), categories=pd.unique(df[coluna].astype(str)))
+    for coluna in ['QUESTAO', 'ITEM', 'ITEM_AJUST']:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(df[coluna].cat.categories.dtype)
+    df = pd.concat([df, pd.DataFrame(scores, columns=ports)], axis=1)
+    df['MEDIA'] = port_average(df[ports])
+    tema_means = group_means(df, ports + ['MEDIA']).reset_index()
+    temas = [str(tema) for tema in df['TEMA'].cat.categories]
+    return Dataset(df, ports, temas, tema_means, path, version, tema_index(df))
+
+
+def _partition_dir(period, directory):
+    return os.path.join(directory, f'period={period}')
+
+
+def _partition_file(period, directory):
+    folder = _partition_dir(period, directory)
+    for name in ('scores.parquet', 'scores.pkl'):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Period '{period}' not found in {directory}")
+
+
+# Grava a partição de um período de forma atômica (Parquet, ou pickle sem engine Parquet)
+def write_period(long, period, directory=PERIODS_DIR):
+    folder = _partition_dir(period, directory)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    os.close(fd)
+    try:
+        try:
+            long.to_parquet(tmp_path, index=False)
+            name = 'scores.parquet'
+        except ImportError:
+            long.to_pickle(tmp_path)
+            name = 'scores.pkl'
+        os.replace(tmp_path, os.path.join(folder, name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.join(folder, name)
+
+
+# Importa um BASE.csv (formato largo) como o período `period`
+def import_period(period, path=BASE_PATH, directory=PERIODS_DIR):
+    period = str(period)
+    if not re.fullmatch(r'[\w.-]+', period) or period == CURRENT:
+        raise ValueError(f"Invalid period name: {period!r}")
+    return write_period(to_long(read_base(path), period), period, directory)
+
+
+# Períodos guardados em disco, em ordem crescente
+def list_periods(directory=PERIODS_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[len('period='):] for name in os.listdir(directory)
+                  if name.startswith('period=') and os.path.isdir(os.path.join(directory, name)))
+
+
+def _read_partition(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+# Dataset de um período; só a partição pedida é lida, e apenas quando o arquivo muda.
+# O período atual é o próprio BASE.csv (com recarga incremental).
+def load_period(period, directory=PERIODS_DIR):
+    if period in (None, CURRENT):
+        return load_dataset()
+    path = _partition_file(period, directory)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _partitions.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _lock:
+        cached = _partitions.get(path)
+        if cached is None or cached[0] != signature:
+            version = f"{period}:{stat.st_mtime_ns}:{stat.st_size}"
+            cached = _partitions[path] = (signature, from_long(_read_partition(path), path, version))
+    return cached[1]
+
+
+# Notas de `other` alinhadas às linhas de `df_slice` pela chave (TEMA, ITEM_AJUST);
+# itens ou portos que não existem no outro período ficam NaN
+def align(other, df_slice, columns):
+    index = pd.MultiIndex.from_arrays([other.df['TEMA'].astype(str), other.df['ITEM_AJUST']])
+    rows = index.get_indexer(pd.MultiIndex.from_arrays([df_slice['TEMA'].astype(str), df_slice['ITEM_AJUST']]))
+    present = [coluna for coluna in columns if coluna in other.df.columns]
+    values = np.full((len(df_slice), len(columns)), np.nan, dtype=np.float32)
+    if present:
+        found = rows >= 0
+        source = other.df[present].to_numpy(dtype=np.float32)[rows[found]]
+        values[np.ix_(found, [columns.index(coluna) for coluna in present])] = source
+    return pd.DataFrame(values, columns=columns, index=df_slice.index)
+
+
+# Diferença (current - previous) de todas as notas de todos os portos em uma única operação,
+# sobre as linhas e portos do período atual
+def deltas(current, previous):
+    columns = current.ports + ['MEDIA']
+    aligned = align(previous, current.df, columns)
+    delta = current.df[columns].to_numpy(dtype=np.float32) - aligned.to_numpy()
+    return pd.concat([current.df[ITEM_KEY], pd.DataFrame(delta, columns=columns, index=current.df.index)], axis=1)
+
+
+# Diferença de uma estatística por TEMA (média por padrão) de cada porto entre dois períodos
+def tema_deltas(current, previous, statistic=MEAN):
+    columns = current.ports + ['MEDIA']
+    before, after = tema_statistic(previous, statistic), tema_statistic(current, statistic)
+    before = before.assign(TEMA=before['TEMA'].astype(str)).set_index('TEMA')
+    after = after.assign(TEMA=after['TEMA'].astype(str)).set_index('TEMA')
+    return after[columns] - before.reindex(index=after.index, columns=columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sdg.periods', description='Manage stored assessment periods.')
+    parser.add_argument('--directory', default=PERIODS_DIR, help='periods folder (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help='store a BASE.csv file as a period')
+    importer.add_argument('period', help='period name, e.g. 2023')
+    importer.add_argument('--data', default=BASE_PATH, help='wide BASE.csv to import (default: %(default)s)')
+    commands.add_parser('list', help='list stored periods')
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        print(import_period(args.period, args.data, args.directory))
+    else:
+        for period in list_periods(args.directory):
+            print(period)
+
+
+if __name__ == '__main__':
+    main()
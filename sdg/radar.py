@@ -0,0 +1,105 @@
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+from matplotlib.patches import Circle, RegularPolygon
+from matplotlib.path import Path
+from matplotlib.projections import register_projection
+from matplotlib.projections.polar import PolarAxes
+from matplotlib.spines import Spine
+from matplotlib.transforms import Affine2D
+
+FRAMES = ('circle', 'polygon')
+
+
+class Radar(NamedTuple):
+    name: str                    # nome da projeção registrada no matplotlib
+    num_vars: int
+    frame: str
+    theta: np.ndarray            # ângulos de cada eixo (radianos)
+    degrees: np.ndarray          # os mesmos ângulos em graus, para set_thetagrids
+    spine_path: Optional[Path]   # polígono unitário da moldura (None para 'circle')
+
+
+# Projeções já construídas neste processo, indexadas por (num_vars, frame)
+_radars = {}
+_lock = threading.Lock()
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+# Cria e registra as classes RadarTransform/RadarAxes para um par (num_vars, frame)
+def _build_radar(num_vars, frame):
+    theta = _readonly(np.linspace(0, 2 * np.pi, num_vars, endpoint=False))
+    degrees = _readonly(np.degrees(theta))
+    spine_path = Path.unit_regular_polygon(num_vars) if frame == 'polygon' else None
+    name = f'radar-{frame}-{num_vars}'
+
+    class RadarTransform(PolarAxes.PolarTransform):
+        def transform_path_non_affine(self, path):
+            if path._interpolation_steps > 1:
+                path = path.interpolated(num_vars)
+            return Path(self.transform(path.vertices), path.codes)
+
+    class RadarAxes(PolarAxes):
+        PolarTransform = RadarTransform
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.set_theta_zero_location('N')
+
+        def fill(self, *args, closed=True, **kwargs):
+            return super().fill(closed=closed, *args, **kwargs)
+
+        def plot(self, *args, **kwargs):
+            lines = super().plot(*args, **kwargs)
+            for line in lines:
+                self._close_line(line)
+            return lines
+
+        def _close_line(self, line):
+            x, y = line.get_data()
+            if x[0] != x[-1]:
+                x = np.append(x, x[0])
+                y = np.append(y, y[0])
+                line.set_data(x, y)
+
+        def set_varlabels(self, labels, fontsize=10):
+            self.set_thetagrids(degrees, labels, fontsize=fontsize)
+
+        def _gen_axes_patch(self):
+            if frame == 'circle':
+                return Circle((0.5, 0.5), 0.5)
+            return RegularPolygon((0.5, 0.5), num_vars, radius=.5, edgecolor="k")
+
+        def _gen_axes_spines(self):
+            if frame == 'circle':
+                return super()._gen_axes_spines()
+            spine = Spine(axes=self, spine_type='circle', path=spine_path)
+            spine.set_transform(Affine2D().scale(.5).translate(.5, .5) + self.transAxes)
+            return {'polar': spine}
+
+    RadarAxes.name = name
+    RadarAxes.__name__ = RadarAxes.__qualname__ = f'RadarAxes{num_vars}{frame.title()}'
+    register_projection(RadarAxes)
+    return Radar(name, num_vars, frame, theta, degrees, spine_path)
+
+
+# Retorna a projeção de radar para (num_vars, frame), registrando-a apenas na primeira chamada
+def radar_factory(num_vars, frame='circle'):
+    key = (num_vars, frame)
+    radar = _radars.get(key)
+    if radar is not None:
+        return radar
+    if frame not in FRAMES:
+        raise ValueError("Unknown value for 'frame': %s" % frame)
+    if num_vars < 1:
+        raise ValueError("num_vars must be at least 1, got %s" % num_vars)
+    with _lock:
+        radar = _radars.get(key)
+        if radar is None:
+            radar = _radars[key] = _build_radar(num_vars, frame)
+    return radar
@@ -0,0 +1,249 @@
+import atexit
+import contextlib
+import functools
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sdg import metrics
+from sdg.cache import chart_cache
+from sdg.charts import render_chart
+
+# Número de processos de desenho (SDG_RENDER_WORKERS=0 ou 1 desenha tudo na thread do script)
+WORKERS = int(os.environ.get('SDG_RENDER_WORKERS') or os.cpu_count() or 1)
+
+_executor = None
+_starting = None    # thread que está criando o pool
+_disabled = False
+_lock = threading.Lock()
+
+# Desenhos já enviados ao pool e ainda não terminados, por chave de cache
+_pending = {}
+
+
+# Cada processo já importa o matplotlib e o módulo de desenho ao subir, e não no primeiro
+# gráfico; os `workers` processos dividem entre si o limite dos fundos em cache
+def _init_worker(workers):
+    import matplotlib
+    matplotlib.use('Agg')
+    from sdg import charts
+    charts.BACKGROUND_CACHE_MB /= max(1, workers)
+
+
+def _ping():
+    return os.getpid()
+
+
+# O Streamlit executa cada página como módulo __main__; sem esta troca, o 'spawn'
+# reexecutaria a página dentro de cada processo de desenho
+@contextlib.contextmanager
+def _neutral_main():
+    main = sys.modules.get('__main__')
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+# Sobe o pool de desenho. Só os pontos de entrada de linha de comando chamam esta função
+# (sdg.serve antes de subir o servidor, python -m sdg.warmup, o relatório e os
+# benchmarks), antes de existir qualquer sessão: o 'spawn' troca o __main__ do processo
+# inteiro enquanto inicia os processos, o que correria contra as páginas que rodam como
+# __main__. As páginas nunca sobem o pool; sem ele, desenham na própria thread.
+# 'spawn' evita herdar threads e locks; todos os processos são iniciados aqui mesmo, com o
+# __main__ neutro. Importar o matplotlib em cada um leva segundos, então o pool só é
+# publicado, em segundo plano, quando todos responderam.
+def start_pool():
+    global _starting
+    if WORKERS <= 1 or _disabled:
+        return
+    with _lock:
+        if _executor is not None or _starting is not None:
+            return
+        try:
+            with _neutral_main():
+                executor = ProcessPoolExecutor(max_workers=WORKERS, initializer=_init_worker, initargs=(WORKERS,),
+                                               mp_context=multiprocessing.get_context('spawn'))
+                pings = [executor.submit(_ping) for _ in range(WORKERS)]
+        except (OSError, ValueError, NotImplementedError, RuntimeError):
+            return
+        _starting = threading.Thread(target=_publish, args=(executor, pings), name='sdg-render-pool', daemon=True)
+        _starting.start()
+
+
+def _publish(executor, pings):
+    global _executor, _starting
+    try:
+        for ping in pings:
+            ping.result()
+    except (BrokenProcessPool, OSError, RuntimeError):
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+    with _lock:
+        _starting = None
+        if _disabled and executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+        _executor = executor
+
+
+# Pool de desenho, ou None se ele não foi iniciado, caiu ou (com wait=False) ainda está
+# subindo; nunca inicia o pool
+def get_executor(wait=False):
+    if WORKERS <= 1 or _disabled:
+        return None
+    starting = _starting
+    if wait and starting is not None:
+        starting.join()
+    return _executor
+
+
+# Descarta o pool (por exemplo, depois que um processo morreu); daí em diante as páginas
+# desenham na própria thread
+def shutdown(disable=False):
+    global _executor, _disabled
+    with _lock:
+        executor, _executor = _executor, None
+        _disabled = _disabled or disable
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+# Fim de um desenho do pool: a imagem vai para o cache e o envio sai de _pending, mesmo
+# que a execução da página que o pediu tenha sido interrompida ou a seleção tenha mudado
+def _finished(key, fmt, cache, future):
+    try:
+        if not future.cancelled() and future.exception() is None:
+            cache.put(key, future.result(), fmt)
+    finally:
+        with _lock:
+            if _pending.get(key) is future:
+                del _pending[key]
+
+
+# Envia ao pool os gráficos ausentes do cache (sem esperar pelo desenho), reaproveitando
+# envios pendentes; com wait=False, nada é enviado enquanto o pool ainda sobe
+def _submit(keys, specs, cache, wait=False):
+    executor = get_executor(wait)
+    if executor is None:
+        return {}
+    futures = {}
+    submitted = []
+    try:
+        with _lock:
+            for key, spec in zip(keys, specs):
+                if spec.renderer != 'matplotlib':
+                    continue  # o SVG vetorizado é mais barato que o envio ao pool
+                future = _pending.get(key)
+                if future is None and cache.get(key, spec.fmt) is None:
+                    future = _pending[key] = executor.submit(render_chart, spec)
+                    submitted.append((key, spec.fmt, future))
+                if future is not None:
+                    futures[key] = future
+    except (BrokenProcessPool, RuntimeError):
+        shutdown()
+    # Fora da trava: um envio que já terminou chama _finished aqui mesmo
+    for key, fmt, future in submitted:
+        future.add_done_callback(functools.partial(_finished, key, fmt, cache))
+    return futures
+
+
+# Adianta o desenho de gráficos que a página vai pedir em seguida
+def prefetch(specs, cache=chart_cache):
+    specs = list(specs)
+    _submit([spec.key() for spec in specs], specs, cache)
+
+
+# Gera as imagens na mesma ordem de `specs`: acertos vêm do cache, faltas (mesmo uma só)
+# são desenhadas em paralelo no pool e, se ele não estiver disponível (ou ainda estiver
+# subindo), na própria thread. O que o pool desenha chega ao cache por _finished; o
+# resultado do envio só é usado se a imagem ainda não estiver lá.
+def iter_charts(specs, cache=chart_cache):
+    specs = list(specs)
+    keys = [spec.key() for spec in specs]
+    images = [cache.get(key, spec.fmt) for key, spec in zip(keys, specs)]
+    missing = [index for index, image in enumerate(images) if image is None]
+    for image in images:
+        metrics.count('chart', 'miss' if image is None else 'hit')
+
+    futures = {}
+    if missing:
+        futures = _submit([keys[index] for index in missing], [specs[index] for index in missing], cache)
+
+    for index, (key, spec) in enumerate(zip(keys, specs)):
+        image = images[index]
+        if image is None:
+            image = cache.get(key, spec.fmt)
+        future = futures.get(key) if image is None else None
+        if future is not None:
+            try:
+                with metrics.span('pool_wait'):
+                    future.result()
+            except (BrokenProcessPool, pickle.PicklingError, OSError):
+                shutdown()
+            else:
+                image = cache.get(key, spec.fmt) or future.result()
+        if image is None:
+            image = render_chart(spec)
+            cache.put(key, image, spec.fmt)
+        yield image
+
+
+def render_many(specs, cache=chart_cache):
+    return list(iter_charts(specs, cache))
+
+
+def _start(spec, executor, cache):
+    if cache is not None:
+        image = cache.get(spec.key(), spec.fmt)
+        if image is not None:
+            return image
+    if executor is not None and spec.renderer == 'matplotlib':
+        try:
+            return executor.submit(render_chart, spec)
+        except (BrokenProcessPool, RuntimeError):
+            shutdown()
+    return None
+
+
+def _finish(spec, started, cache):
+    if isinstance(started, bytes):
+        return started
+    image = None
+    if started is not None:
+        try:
+            image = started.result()
+        except (BrokenProcessPool, pickle.PicklingError, OSError):
+            shutdown()
+    if image is None:
+        image = render_chart(spec)
+    if cache is not None:
+        cache.put(spec.key(), image, spec.fmt)
+    return image
+
+
+# Desenha uma sequência (possivelmente enorme) de pares (nome, spec) mantendo no máximo
+# `window` desenhos em andamento; devolve (nome, imagem) na ordem de entrada. Usa o pool
+# iniciado pelo chamador (start_pool), esperando que ele termine de subir.
+def stream_charts(items, window=None, cache=chart_cache):
+    executor = get_executor(wait=True)
+    window = window or max(1, WORKERS) * 4
+    pending = deque()
+    for name, spec in items:
+        pending.append((name, spec, _start(spec, executor, cache)))
+        if len(pending) >= window:
+            name, spec, started = pending.popleft()
+            yield name, _finish(spec, started, cache)
+    while pending:
+        name, spec, started = pending.popleft()
+        yield name, _finish(spec, started, cache)
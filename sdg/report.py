@@ -0,0 +1,170 @@
+# Relatório em lote: desenha todos os gráficos das páginas para todos os portos e grava
+# em um ZIP ou PDF à medida que ficam prontos.
+#
+#     python -m sdg.report --output relatorio.zip
+#     python -m sdg.report --output relatorio.pdf --sections average --workers 8
+import argparse
+import io
+import re
+import sys
+import time
+import zipfile
+
+from sdg import render
+from sdg.data import BASE_PATH, load_dataset
+from sdg.ui import PORTS_PER_PAGE
+from sdg.views import (item_count, port_overview_spec, sdg_grid_spec, sdg_pair_spec, tema_areas, tema_group,
+                       tema_slice)
+
+SECTIONS = ('sdg', 'ports', 'average')
+
+
+def slug(text):
+    return re.sub(r'[^0-9A-Za-z]+', '-', str(text)).strip('-').lower() or 'x'
+
+
+def _pages(ports, per_page=PORTS_PER_PAGE):
+    for start in range(0, len(ports), per_page):
+        yield start // per_page + 1, ports[start:start + per_page]
+
+
+# View by SDG: grade por página de portos e par porto/média para cada tema e área
+def sdg_items(dataset, ports, renderer):
+    for tema in dataset.temas:
+        for area in ["All"] + tema_areas(dataset, tema):
+            df_filtrado, grupo = tema_slice(dataset, tema, area), tema_group(dataset, tema, area)
+            if df_filtrado.empty or item_count(grupo) == 0:
+                continue
+            folder = f"view-by-sdg/{slug(tema)}/{slug(area)}"
+            for page, chunk in _pages(ports):
+                yield f"{folder}/grid-{page:03d}", sdg_grid_spec(df_filtrado, grupo, chunk, renderer)
+            for porto in ports:
+                yield f"{folder}/{slug(porto)}", sdg_pair_spec(df_filtrado, grupo, porto, renderer)
+
+
+# SDG per Port: médias por TEMA de cada porto
+def ports_items(dataset, ports, renderer):
+    for page, chunk in _pages(ports):
+        yield f"sdg-per-port/grid-{page:03d}", port_overview_spec(dataset, chunk, renderer)
+
+
+# SDG and Average: porto ao lado da média para cada tema
+def average_items(dataset, ports, renderer):
+    slices = [(tema, tema_slice(dataset, tema), tema_group(dataset, tema)) for tema in dataset.temas]
+    for porto in ports:
+        for tema, df_filtrado, grupo in slices:
+            if item_count(grupo):
+                yield (f"sdg-and-average/{slug(porto)}/{slug(tema)}",
+                       sdg_pair_spec(df_filtrado, grupo, porto, renderer, tema=tema))
+
+
+BUILDERS = {'sdg': sdg_items, 'ports': ports_items, 'average': average_items}
+
+
+def report_items(dataset, sections=SECTIONS, ports=None, renderer='matplotlib'):
+    ports = list(ports or dataset.ports)
+    for section in sections:
+        yield from BUILDERS[section](dataset, ports, renderer)
+
+
+class ZipReport:
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, 'w')
+
+    def add(self, name, image):
+        svg = image.lstrip()[:1] == b'<'
+        compression = zipfile.ZIP_DEFLATED if svg else zipfile.ZIP_STORED  # PNG já é comprimido
+        self.archive.writestr(f"{name}.{'svg' if svg else 'png'}", image, compress_type=compression)
+
+    def close(self):
+        self.archive.close()
+
+
+# Uma página de PDF por gráfico, com o nome do gráfico no topo
+class PdfReport:
+    DPI = 200
+
+    def __init__(self, path):
+        from matplotlib.backends.backend_pdf import PdfPages
+        self.pages = PdfPages(path, metadata={'Title': 'SDG Attributes report'})
+
+    def add(self, name, image):
+        import matplotlib.image as mpimg
+        from matplotlib.figure import Figure
+
+        pixels = mpimg.imread(io.BytesIO(image), format='png')
+        height, width = pixels.shape[:2]
+        caption = 0.4
+        figure = Figure(figsize=(width / self.DPI, height / self.DPI + caption), dpi=self.DPI)
+        figure.figimage(pixels, xo=0, yo=0)
+        figure.text(0.01, 1 - caption / 2 / figure.get_figheight(), name, fontsize=9, va='center')
+        self.pages.savefig(figure)
+        figure.clear()
+
+    def close(self):
+        self.pages.close()
+
+
+def open_report(path):
+    if path.lower().endswith('.pdf'):
+        return PdfReport(path)
+    if path.lower().endswith('.zip'):
+        return ZipReport(path)
+    raise ValueError("The output must be a .zip or .pdf file: %s" % path)
+
+
+def write_report(output, items, window=None, cache=render.chart_cache, progress=None):
+    report = open_report(output)
+    count = 0
+    try:
+        for name, image in render.stream_charts(items, window=window, cache=cache):
+            report.add(name, image)
+            count += 1
+            if progress is not None:
+                progress(count, name)
+    finally:
+        report.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sdg.report',
+                                     description='Render every SDG radar chart into a ZIP or PDF report.')
+    parser.add_argument('--output', '-o', required=True, help='report file (.zip or .pdf)')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS),
+                        help='pages to include (default: all)')
+    parser.add_argument('--ports', nargs='+', help='only these ports (default: every port in the data)')
+    parser.add_argument('--renderer', choices=('matplotlib', 'svg'), default='matplotlib')
+    parser.add_argument('--workers', type=int, help='rendering processes (default: SDG_RENDER_WORKERS or CPU count)')
+    parser.add_argument('--data', default=BASE_PATH, help='BASE.csv path')
+    parser.add_argument('--no-cache', action='store_true', help='do not read or fill the chart cache')
+    args = parser.parse_args(argv)
+
+    if args.renderer == 'svg' and args.output.lower().endswith('.pdf'):
+        parser.error('PDF reports need --renderer matplotlib')
+    if args.workers is not None:
+        render.WORKERS = args.workers
+    render.start_pool()
+
+    dataset = load_dataset(args.data)
+    unknown = sorted(set(args.ports or ()) - set(dataset.ports))
+    if unknown:
+        parser.error(f"unknown ports: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+
+    def progress(count, name):
+        if count % 100 == 0:
+            print(f"{count} charts ({time.perf_counter() - started:.0f}s) - {name}", file=sys.stderr)
+
+    items = report_items(dataset, args.sections, args.ports, args.renderer)
+    try:
+        count = write_report(args.output, items, cache=None if args.no_cache else render.chart_cache,
+                             progress=progress)
+    finally:
+        render.shutdown()
+    print(f"{count} charts written to {args.output} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+# Sobe o servidor do Streamlit neste mesmo processo depois de iniciar o pool de desenho
+# (sdg/render.py) e o aquecimento (sdg/warmup.py) em segundo plano: os dados, as
+# estatísticas e os gráficos padrão ficam nos caches em memória do processo que atende as
+# sessões, e não só no cache em disco, antes mesmo do primeiro visitante. O pool só pode
+# subir aqui, antes de qualquer sessão (as páginas nunca o iniciam). Os argumentos são os
+# mesmos de `streamlit run`.
+#
+#     python -m sdg.serve Home.py --server.port=$PORT
+import sys
+
+from sdg.render import start_pool
+from sdg.warmup import start_warmup
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv) or ['Home.py']
+    from streamlit.web import cli
+    start_pool()
+    start_warmup(enabled=True)
+    return cli.main(['run', *args], prog_name='streamlit')
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+# Estatísticas das notas de cada porto (e da MEDIA) por TEMA: média, mediana, quartis,
+# mínimo, máximo, desvio padrão e médias ponderadas por AREA e por EIXO. Todas são
+# calculadas juntas, em uma única passada pelos blocos de linhas de cada tema, e guardadas
+# por versão do Dataset; trocar de estatística nas páginas é só uma consulta.
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from sdg.data import derived
+
+MEAN = 'Mean'
+PERCENTILES = {'Min': 0, 'P25': 25, 'Median': 50, 'P75': 75, 'Max': 100}
+WEIGHTED = {'AREA-weighted': 'AREA', 'EIXO-weighted': 'EIXO'}
+STATISTICS = [MEAN, 'Median', 'P25', 'P75', 'Min', 'Max', 'Std'] + list(WEIGHTED)
+
+
+class TemaStatistics(NamedTuple):
+    temas: list           # linhas, na ordem de dataset.tema_means
+    columns: list         # portos + MEDIA
+    values: np.ndarray    # float32 (estatística x tema x coluna), na ordem de STATISTICS
+
+
+# Peso de cada linha para que cada grupo (AREA ou EIXO) conte igualmente no seu tema:
+# 1 / (grupos no tema x linhas do grupo)
+def _weights(df, by):
+    size = df.groupby(['TEMA', by], observed=True)[by].transform('size').to_numpy(dtype=np.float64)
+    groups = df.groupby('TEMA', observed=True)[by].transform('nunique').to_numpy(dtype=np.float64)
+    return 1.0 / (size * groups)
+
+
+def _weighted(block, weights):
+    present = ~np.isnan(block)
+    return weights @ np.where(present, block, 0) / (weights @ present)
+
+
+def compute_statistics(dataset):
+    columns = dataset.ports + ['MEDIA']
+    temas = [str(tema) for tema in dataset.tema_means['TEMA']]
+    scores = dataset.df[columns].to_numpy(dtype=np.float64)
+    weights = {name: _weights(dataset.df, by) for name, by in WEIGHTED.items()}
+    values = np.full((len(STATISTICS), len(temas), len(columns)), np.nan, dtype=np.float32)
+    position = {name: index for index, name in enumerate(STATISTICS)}
+
+    for row, tema in enumerate(temas):
+        group = dataset.groups.group(tema)
+        if group is None:
+            continue
+        block = scores[group.rows]
+        present = ~np.isnan(block)
+        # Colunas sem nenhuma nota no tema ficam NaN; sem notas ausentes, usa as funções sem
+        # tratamento de NaN (mais rápidas)
+        valid = present.any(axis=0)
+        if present.all():
+            percentile, mean, std = np.percentile, np.mean, np.std
+        else:
+            percentile, mean, std = np.nanpercentile, np.nanmean, np.nanstd
+        subset = block[:, valid]
+        for name, quantile in zip(PERCENTILES, percentile(subset, list(PERCENTILES.values()), axis=0)):
+            values[position[name], row, valid] = quantile
+        values[position[MEAN], row, valid] = mean(subset, axis=0)
+        values[position['Std'], row, valid] = std(subset, axis=0)
+        for name, weight in weights.items():
+            values[position[name], row, valid] = _weighted(subset, weight[group.rows])
+    return TemaStatistics(temas, columns, values)
+
+
+def tema_statistics(dataset):
+    return derived(dataset, 'tema_statistics', (), lambda: compute_statistics(dataset))
+
+
+# Uma estatística no mesmo formato de dataset.tema_means (coluna TEMA + portos + MEDIA)
+def tema_statistic(dataset, statistic=MEAN):
+    if statistic == MEAN:
+        return dataset.tema_means
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic: {statistic!r}")
+    stats = tema_statistics(dataset)
+    table = pd.DataFrame(stats.values[STATISTICS.index(statistic)], columns=stats.columns)
+    table.insert(0, 'TEMA', dataset.tema_means['TEMA'].to_numpy())
+    return table
@@ -0,0 +1,194 @@
+import hashlib
+import html
+from functools import lru_cache
+
+import numpy as np
+
+from sdg.charts import LAYOUTS, OVERLAY_COLORS, OVERLAY_STYLE, STYLES
+
+# Mesmos parâmetros do matplotlib: polegadas em pontos e margens padrão dos subplots
+POINTS_PER_INCH = 72
+SUBPLOT_DEFAULTS = dict(left=0.125, right=0.9, bottom=0.11, top=0.88, wspace=0.2, hspace=0.2)
+RINGS = np.arange(1, 4)  # círculos de grade 1-3 (o 0 fica no centro)
+LABEL_PAD = 14           # distância dos rótulos dos eixos até a moldura, em pontos
+GRID_COLOR = '#808080'
+DASH = '7.4,3.2'         # padrão '--' do matplotlib para linewidth 2
+DOTS = '1.5,2.5'         # padrão ':' do matplotlib para linewidth 1.5
+
+
+def _color(value):
+    return GRID_COLOR if value == 'gray' else value
+
+
+# Posição e raio de cada subgráfico, reproduzindo o GridSpec + aspecto 'equal' do matplotlib
+def panel_geometry(layout, count):
+    settings = LAYOUTS[layout]
+    params = {**SUBPLOT_DEFAULTS, **settings['adjust']}
+    ncols = settings['ncols']
+    nrows = max(1, -(-count // ncols))
+    width = settings['figsize'][0] * POINTS_PER_INCH
+    height = settings['figsize'][1] * POINTS_PER_INCH * nrows
+
+    cell_w = (params['right'] - params['left']) * width / (ncols + params['wspace'] * (ncols - 1))
+    cell_h = (params['top'] - params['bottom']) * height / (nrows + params['hspace'] * (nrows - 1))
+    index = np.arange(count)
+    row, col = np.divmod(index, ncols)
+    cx = params['left'] * width + col * cell_w * (1 + params['wspace']) + cell_w / 2
+    cy = (1 - params['top']) * height + row * cell_h * (1 + params['hspace']) + cell_h / 2
+    radius = np.full(count, min(cell_w, cell_h) / 2)
+    return cx, cy, radius
+
+
+# Vértices (x, y) de polígonos de radar em lote: `values` tem forma (..., N) e `scale`
+# (centros, raios e limite radial) é aplicada por difusão sobre as dimensões iniciais
+def radar_vertices(values, theta, cx, cy, radius, rmax):
+    r = np.asarray(values, dtype=float) / np.asarray(rmax)[..., None] * np.asarray(radius)[..., None]
+    return np.asarray(cx)[..., None] - r * np.sin(theta), np.asarray(cy)[..., None] - r * np.cos(theta)
+
+
+def _points(xs, ys):
+    return ' '.join(map('{:.1f},{:.1f}'.format, xs, ys))
+
+
+# Contorno de uma série; valores ausentes (NaN) interrompem a linha, como no matplotlib
+def _series_path(xs, ys):
+    finite = np.isfinite(xs) & np.isfinite(ys)
+    if finite.all():
+        return f"M{_points(xs, ys).replace(' ', 'L')}Z"
+    path = []
+    previous = False
+    for x, y, ok in zip(xs, ys, finite):
+        if ok:
+            path.append(f"{'L' if previous else 'M'}{x:.1f},{y:.1f}")
+        previous = ok
+    if finite[0] and finite[-1]:
+        path.append(f"L{xs[0]:.1f},{ys[0]:.1f}")
+    return ''.join(path)
+
+
+def _anchor(dx):
+    return 'middle' if abs(dx) < 1e-6 else ('end' if dx < 0 else 'start')
+
+
+# Fundo estático de um painel, centrado na origem: sob os dados, a área da moldura, os
+# círculos de grade, os raios e o contorno; sobre eles, os rótulos dos círculos (1-3) e dos
+# eixos. Só depende de N, da moldura, do raio, do limite radial e dos rótulos, então é
+# montado uma vez e cada gráfico o referencia com <use>.
+@lru_cache(maxsize=256)
+def background_svg(labels, frame, radius, rmax):
+    theta = np.linspace(0, 2 * np.pi, len(labels), endpoint=False)
+    spoke_x, spoke_y = -radius * np.sin(theta), -radius * np.cos(theta)
+    if frame == 'circle':
+        outline = f"<circle r='{radius:.1f}'"
+        rings = [f"<circle r='{radius * ring / rmax:.1f}' fill='none' stroke='#b0b0b0' stroke-width='0.8'/>"
+                 for ring in RINGS]
+    else:
+        outline = f"<polygon points='{_points(spoke_x, spoke_y)}'"
+        ring_x, ring_y = radar_vertices(np.broadcast_to(RINGS[:, None], (len(RINGS), len(labels))), theta, 0, 0,
+                                        radius, rmax)
+        rings = [f"<polygon points='{_points(xs, ys)}' fill='none' stroke='#b0b0b0' stroke-width='0.8'/>"
+                 for xs, ys in zip(ring_x, ring_y)]
+    under = [f"{outline} fill='white' stroke='none'/>"] + rings + [
+        f"<path d='{''.join(f'M0,0L{x:.1f},{y:.1f}' for x, y in zip(spoke_x, spoke_y))}' "
+        f"stroke='{GRID_COLOR}' stroke-width='0.5'/>",
+        f"{outline} fill='none' stroke='black'/>",
+    ]
+
+    over = [f"<text x='2' y='{-radius * ring / rmax:.1f}' font-size='8'>{ring}</text>" for ring in RINGS]
+    label_x = -(radius + LABEL_PAD) * np.sin(theta)
+    label_y = -(radius + LABEL_PAD) * np.cos(theta)
+    for label, x, y in zip(labels, label_x, label_y):
+        over.append(f"<text x='{x:.1f}' y='{y:.1f}' font-size='10' text-anchor='{_anchor(x)}' "
+                    f"dominant-baseline='central'>{html.escape(label)}</text>")
+
+    name = 'radar-' + hashlib.sha1(repr((labels, frame, radius, rmax)).encode('utf-8')).hexdigest()[:12]
+    return name, f"<g id='{name}-u'>{''.join(under)}</g><g id='{name}-o'>{''.join(over)}</g>"
+
+
+def _use(name, layer, cx, cy):
+    return f"<use href='#{name}-{layer}' x='{cx:.1f}' y='{cy:.1f}'/>"
+
+
+def _panel_svg(panel, background, theta, cx, cy, radius, rmax, poly_x, poly_y):
+    parts = [_use(background, 'u', cx, cy)]
+
+    # Série de dados; com notas ausentes vira um caminho com a linha interrompida
+    line_style, fill_style = STYLES[panel.style]
+    dash = f" stroke-dasharray='{DASH}'" if line_style.get('linestyle') == '--' else ''
+    if np.isfinite(poly_x).all() and np.isfinite(poly_y).all():
+        shape = f"<polygon points='{_points(poly_x, poly_y)}'"
+    else:
+        shape = f"<path d='{_series_path(poly_x, poly_y)}'"
+    parts.append(f"{shape} fill='{_color(fill_style['color'])}' "
+                 f"fill-opacity='{fill_style['alpha']}' stroke='{_color(line_style['color'])}' "
+                 f"stroke-width='{line_style['linewidth']}'{dash}/>")
+
+    # Séries de outros períodos, com legenda no canto superior direito
+    for position, (label, series) in enumerate(panel.overlays):
+        color = OVERLAY_COLORS[position % len(OVERLAY_COLORS)]
+        xs, ys = radar_vertices(series, theta, cx, cy, radius, rmax)
+        parts.append(f"<path d='{_series_path(xs, ys)}' fill='none' stroke='{color}' "
+                     f"stroke-width='{OVERLAY_STYLE['linewidth']}' stroke-dasharray='{DOTS}'/>")
+        legend_x = cx + radius * 0.8
+        legend_y = cy - radius * 1.1 + position * 12
+        parts.append(f"<path d='M{legend_x:.1f},{legend_y:.1f}h16' stroke='{color}' "
+                     f"stroke-width='{OVERLAY_STYLE['linewidth']}' stroke-dasharray='{DOTS}'/>")
+        parts.append(f"<text x='{legend_x + 20:.1f}' y='{legend_y:.1f}' font-size='8' "
+                     f"dominant-baseline='central'>{html.escape(label)}</text>")
+
+    # Rótulos dos círculos e dos eixos (do fundo) e título
+    parts.append(_use(background, 'o', cx, cy))
+    parts.append(f"<text x='{cx:.1f}' y='{cy - radius * 1.2:.1f}' font-size='10' font-weight='bold' "
+                 f"text-anchor='middle'>{html.escape(panel.title)}</text>")
+    return ''.join(parts)
+
+
+# Desenha vários gráficos em SVG; os vértices de todos os painéis com o mesmo N são
+# calculados em uma única operação vetorizada
+def render_svg_batch(specs):
+    specs = list(specs)
+    results = [None] * len(specs)
+    by_size = {}
+    for index, spec in enumerate(specs):
+        by_size.setdefault(len(spec.labels), []).append(index)
+
+    for num_vars, indexes in by_size.items():
+        theta = np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
+        geometry = [panel_geometry(specs[i].layout, len(specs[i].panels)) for i in indexes]
+        cx = np.concatenate([g[0] for g in geometry])
+        cy = np.concatenate([g[1] for g in geometry])
+        radius = np.concatenate([g[2] for g in geometry])
+        values = np.array([panel.values for i in indexes for panel in specs[i].panels], dtype=float).reshape(-1, num_vars)
+
+        # Limite radial como no matplotlib: inclui a grade até 3 e 5% de margem acima do máximo
+        # (e as séries sobrepostas), ignorando notas ausentes
+        peaks = np.array([max([np.nanmax(series, initial=0) for _, series in panel.overlays], default=0)
+                          for i in indexes for panel in specs[i].panels], dtype=float)
+        rmax = np.maximum(RINGS[-1], np.maximum(np.nanmax(values, axis=1, initial=0), peaks) * 1.05)
+        poly_x, poly_y = radar_vertices(values, theta, cx, cy, radius, rmax)
+
+        offset = 0
+        for i in indexes:
+            spec = specs[i]
+            count = len(spec.panels)
+            # Fundos usados pelo gráfico, cada um definido uma única vez em <defs>
+            defs, body = {}, []
+            for panel, k in zip(spec.panels, range(offset, offset + count)):
+                name, group = background_svg(spec.labels, spec.frame, float(radius[k]), float(rmax[k]))
+                defs[name] = group
+                body.append(_panel_svg(panel, name, theta, cx[k], cy[k], radius[k], rmax[k], poly_x[k], poly_y[k]))
+            sl = slice(offset, offset + count)
+            left = (cx[sl] - radius[sl]).min() - 60
+            top = (cy[sl] - radius[sl] * 1.2).min() - 14
+            right = (cx[sl] + radius[sl]).max() + (120 if any(p.overlays for p in spec.panels) else 60)
+            bottom = (cy[sl] + radius[sl]).max() + 30
+            results[i] = (
+                f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='{left:.0f} {top:.0f} {right - left:.0f} {bottom - top:.0f}' "
+                f"font-family='DejaVu Sans, sans-serif'><defs>{''.join(defs.values())}</defs>{''.join(body)}</svg>"
+            ).encode('utf-8')
+            offset += count
+    return results
+
+
+def render_svg(spec):
+    return render_svg_batch([spec])[0]
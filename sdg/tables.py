@@ -0,0 +1,48 @@
+import html
+
+import numpy as np
+
+TABLE_START = """
+    <table style='width:100%; border-collapse: collapse;'>
+        <thead>
+            <tr style='background-color: #333333; color: white; font-weight: bold; border: 1px solid black;'>
+                <th style='text-align: center; padding: 8px; border: 1px solid black;'>ATTRIBUTE</th>
+                <th style='text-align: center; padding: 8px; border: 1px solid black;'>METRIC</th>
+            </tr>
+        </thead>
+        <tbody>
+    """
+TABLE_END = "</tbody></table>"
+
+CELL_STYLE = "border: 1px solid black; padding: 8px; text-align: left;"
+ROW_COLORS = ("#F2F2F2", "#FFFFFF")  # Cinza claro / Branco, alternados a cada atributo
+
+
+# Início e tamanho de cada sequência de linhas com o mesmo ATTRIBUTE, em uma única passada
+def attribute_runs(attributes):
+    attributes = np.asarray(attributes, dtype=object)
+    if len(attributes) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    starts = np.flatnonzero(np.r_[True, attributes[1:] != attributes[:-1]])
+    lengths = np.diff(np.r_[starts, len(attributes)])
+    return starts, lengths
+
+
+# Gera as linhas da tabela (células ATTRIBUTE mescladas e linhas alternadas) sob demanda
+def iter_table_rows(df):
+    attributes = df["ATTRIBUTE"].to_numpy(dtype=object)
+    metrics = df["METRIC"].to_numpy(dtype=object)
+    starts, lengths = attribute_runs(attributes)
+
+    for run, (start, length) in enumerate(zip(starts, lengths)):
+        row_open = f"<tr style='background-color: {ROW_COLORS[run % 2]};'>"
+        attribute = html.escape(str(attributes[start]))
+        yield (f"{row_open}<td rowspan='{length}' style='{CELL_STYLE}'>{attribute}</td>"
+               f"<td style='{CELL_STYLE}'>{html.escape(str(metrics[start]))}</td></tr>")
+        for metric in metrics[start + 1:start + length]:
+            yield f"{row_open}<td style='{CELL_STYLE}'>{html.escape(str(metric))}</td></tr>"
+
+
+# Função para criar HTML com células mescladas na coluna ATTRIBUTE e linhas alternadas
+def create_html_table(df):
+    return "".join([TABLE_START, *iter_table_rows(df), TABLE_END])
@@ -0,0 +1,134 @@
+import math
+import os
+import time
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+from sdg.charts import OVERLAY_COLORS, RENDERERS
+from sdg.data import load_dataset
+from sdg.exports import FORMATS, available_formats, export_bytes, file_name
+from sdg.periods import CURRENT, list_periods, load_period
+from sdg.stats import STATISTICS
+
+# Quantos portos são desenhados por vez (uma grade 2x3)
+PORTS_PER_PAGE = 6
+
+# Intervalo (segundos) com que cada sessão verifica se BASE.csv mudou; 0 desativa
+WATCH_SECONDS = float(os.environ.get('SDG_WATCH_SECONDS', 10))
+
+
+def page_count(total, per_page=PORTS_PER_PAGE):
+    return max(1, math.ceil(total / per_page))
+
+
+def page_slice(items, page, per_page=PORTS_PER_PAGE):
+    start = (page - 1) * per_page
+    return items[start:start + per_page]
+
+
+# Seletor de página de portos; só os portos da página visível são desenhados
+def port_page(ports, key, per_page=PORTS_PER_PAGE):
+    pages = page_count(len(ports), per_page)
+    if pages == 1:
+        return list(ports)
+    page = st.number_input(f"Ports page (1-{pages}, {len(ports)} ports)", min_value=1, max_value=pages,
+                           value=1, step=1, key=key)
+    return list(page_slice(ports, int(page), per_page))
+
+
+# Escolha do renderizador dos radares na barra lateral da página
+def renderer_selector(key):
+    return st.sidebar.radio(
+        "Chart renderer", RENDERERS, key=key,
+        help="'svg' draws the radar charts directly as SVG: much faster to render and lighter to download.",
+    )
+
+
+# Gráficos agrupados em uma única imagem (pequenos múltiplos) em vez de uma imagem por gráfico
+def composite_selector(key):
+    return st.sidebar.toggle(
+        "Single image", key=key,
+        help="Pack the charts into one image: a single download instead of one image per chart.",
+    )
+
+
+# Estatística das notas por SDG desenhada nos radares (já calculadas no carregamento)
+def statistic_selector(key):
+    return st.sidebar.selectbox(
+        "Statistic", STATISTICS, key=key,
+        help="Statistic of each port's scores within every SDG. Weighted scores give each AREA "
+             "(or EIXO) the same weight in its SDG.",
+    )
+
+
+# Downloads da visão exibida; cada arquivo só é gerado quando o usuário clica e fica em
+# cache por seleção e versão dos dados. `frame` devolve a fatia exibida.
+def download_buttons(view, selection, version, frame, key, container=st):
+    with container.popover("Download", icon=":material/download:"):
+        for fmt in available_formats():
+            export = FORMATS[fmt]
+            st.download_button(
+                export.label, data=partial(export_bytes, view, list(selection), version, fmt, frame),
+                file_name=f"{file_name(view, *selection)}.{export.suffix}", mime=export.mime,
+                key=f"{key}_{fmt}", on_click='ignore', width="stretch",
+            )
+
+
+# Exibe a imagem de um gráfico (PNG em bytes ou SVG, que o Streamlit recebe como texto)
+def show_chart(image, container=st):
+    if image.lstrip()[:1] == b'<':
+        image = image.decode('utf-8')
+    container.image(image, width="stretch")
+
+
+# Período exibido e períodos sobrepostos como tendência (só aparece com períodos guardados).
+# Devolve o Dataset do período e os pares (rótulo, Dataset) dos períodos comparados.
+def period_selector(dataset, key):
+    periods = list_periods()
+    if not periods:
+        return dataset, []
+    options = [CURRENT] + periods[::-1]
+    period = st.sidebar.selectbox("Period", options, key=f"{key}_periodo")
+    compare = st.sidebar.multiselect(
+        "Compare with", [option for option in options if option != period], key=f"{key}_comparar",
+        max_selections=len(OVERLAY_COLORS), help="Periods drawn as dotted trend lines over the radar charts.",
+    )
+    selected = dataset if period == CURRENT else load_period(period)
+    return selected, [(label, load_period(label)) for label in compare]
+
+
+@st.fragment(run_every=WATCH_SECONDS or None)
+def _watch_dataset(path, version):
+    try:
+        current = load_dataset(path)
+    except (OSError, ValueError):
+        return
+    if current.version != version:
+        st.rerun()
+
+
+# Reexecuta a página quando o arquivo de dados muda, para que todas as sessões abertas
+# passem a exibir a nova versão sem recarregar o navegador
+def watch_dataset(dataset):
+    if WATCH_SECONDS:
+        _watch_dataset(dataset.path, dataset.version)
+
+
+# Painel opcional na barra lateral com os tempos e caches da execução atual (SDG_METRICS=1)
+def diagnostics_panel(trace):
+    if trace is None:
+        return
+    elapsed = time.perf_counter() - trace.started
+    with st.sidebar.expander("Diagnostics"):
+        st.caption(f"This run: {elapsed * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame(
+            [(name, calls, seconds * 1000) for name, (calls, seconds) in trace.spans.items()],
+            columns=["Phase", "Calls", "ms"],
+        ).round(1), hide_index=True)
+        if trace.caches:
+            st.dataframe(pd.DataFrame(
+                [(cache, counts['hit'], counts['miss']) for cache, counts in trace.caches.items()],
+                columns=["Cache", "Hits", "Misses"],
+            ), hide_index=True)
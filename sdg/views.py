@@ -0,0 +1,99 @@
+# Montagem dos gráficos de cada página, compartilhada pelo Streamlit e pelo relatório em lote
+import numpy as np
+
+from sdg.charts import make_panel, make_spec
+from sdg.periods import align
+from sdg.stats import MEAN, tema_statistic
+
+# SDG and Average: temas exibidos abertos ao carregar a página; os demais são desenhados
+# quando o usuário os abre
+TEMAS_INICIAIS = 2
+
+
+# Fatia de um tema e, opcionalmente, de uma área ("All" ou None para todas), lida do
+# índice TEMA -> AREA do Dataset, sem varrer o DataFrame
+def tema_slice(dataset, tema, area=None):
+    return dataset.groups.frame(dataset.df, tema, area)
+
+
+# Grupo da mesma fatia no índice, com os rótulos distintos (ITEM_AJUST) e o N do radar já
+# calculados no carregamento; None se o tema/área não existir
+def tema_group(dataset, tema, area=None):
+    return dataset.groups.group(tema, area)
+
+
+def tema_areas(dataset, tema):
+    return dataset.groups.children(tema)
+
+
+# Número de variáveis do radar (itens distintos da fatia)
+def item_count(group):
+    return group.size if group is not None else 0
+
+
+def _labels(group):
+    return item_count(group), group.labels if group is not None else ()
+
+
+# Tendência: notas dos períodos comparados (pares (rótulo, Dataset)) alinhadas aos itens da
+# fatia, uma tabela por período; `columns` são os portos/MEDIA que serão desenhados
+def _compared(compare, df_slice, columns):
+    return [(label, align(other, df_slice, list(columns))) for label, other in compare]
+
+
+# Séries sobrepostas de uma coluna; períodos sem nenhum valor para ela são omitidos
+def _overlays(compared, column, N):
+    series = [(label, aligned[column].values[:N]) for label, aligned in compared]
+    return [(label, values) for label, values in series if not np.isnan(values).all()]
+
+
+# View by SDG: grade com os portos para o tema/área
+def sdg_grid_spec(df_slice, group, ports, renderer='matplotlib', compare=()):
+    N, labels = _labels(group)
+    compared = _compared(compare, df_slice, ports)
+    return make_spec('grid', labels, [make_panel(porto, df_slice[porto].values[:N],
+                                                 overlays=_overlays(compared, porto, N)) for porto in ports],
+                     renderer=renderer)
+
+
+# View by SDG (e relatório da página SDG and Average): porto ao lado da média
+def sdg_pair_spec(df_slice, group, port, renderer='matplotlib', tema=None, compare=()):
+    N, labels = _labels(group)
+    suffix = f" - {tema}" if tema else ""
+    compared = _compared(compare, df_slice, [port, 'MEDIA'])
+    return make_spec('pair', labels, [
+        make_panel(f"{port}{suffix}", df_slice[port].values[:N], overlays=_overlays(compared, port, N)),
+        make_panel(f"Average{suffix}", df_slice['MEDIA'].values[:N], style='average',
+                   overlays=_overlays(compared, 'MEDIA', N)),
+    ], renderer=renderer)
+
+
+# SDG per Port: estatística (média por padrão) de cada porto por TEMA, usando TEMA como rótulo
+def port_overview_spec(dataset, ports, renderer='matplotlib', compare=(), statistic=MEAN):
+    means = tema_statistic(dataset, statistic)
+    N = len(means)
+    compared = []
+    for label, other in compare:
+        values = tema_statistic(other, statistic)
+        compared.append((label, values.assign(TEMA=values['TEMA'].astype(str)).set_index('TEMA')
+                         .reindex(index=means['TEMA'].astype(str), columns=list(ports))))
+    return make_spec('grid', means['TEMA'].values,
+                     [make_panel(porto, means[porto].values, overlays=_overlays(compared, porto, N)) for porto in ports],
+                     renderer=renderer)
+
+
+# SDG and Average: gráficos do porto e da média em imagens separadas, para que trocar
+# o porto invalide só a metade do porto
+def average_halves(df_slice, group, tema, port, renderer='matplotlib', compare=()):
+    N, labels = _labels(group)
+    if N == 0:
+        return None
+    compared = _compared(compare, df_slice, [port, 'MEDIA'])
+    return (
+        make_spec('single', labels, [make_panel(f"{port} - {tema}", df_slice[port].values[:N],
+                                                overlays=_overlays(compared, port, N))],
+                  renderer=renderer),
+        make_spec('single', labels, [make_panel(f"Average - {tema}", df_slice['MEDIA'].values[:N], style='average',
+                                                overlays=_overlays(compared, 'MEDIA', N))],
+                  renderer=renderer),
+    )
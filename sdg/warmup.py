@@ -0,0 +1,120 @@
+# Aquecimento dos caches: carrega os dados, calcula as estatísticas por tema, registra as
+# projeções de radar e desenha a seleção padrão de cada página no cache de gráficos
+# (memória + disco), para que o primeiro visitante depois de um deploy ou reinício não
+# pague por tudo isso.
+#
+#     python -m sdg.warmup                 # aquece só o cache em disco antes de subir o app
+#     python -m sdg.serve Home.py          # sobe o servidor já aquecendo memória e disco
+#     SDG_WARMUP=1 streamlit run Home.py   # aquece em segundo plano na primeira visita
+import argparse
+import os
+import threading
+import time
+
+from sdg import metrics
+from sdg.attributes import ATTRIBUTES_PATH, load_attributes
+from sdg.cache import chart_cache
+from sdg.charts import render_chart
+from sdg.data import BASE_PATH, load_dataset
+from sdg.radar import radar_factory
+from sdg.render import render_many, start_pool
+from sdg.stats import tema_statistics
+from sdg.ui import PORTS_PER_PAGE
+from sdg.views import (TEMAS_INICIAIS, average_halves, port_overview_spec, sdg_grid_spec, sdg_pair_spec, tema_group,
+                       tema_slice)
+
+ENABLED = os.environ.get('SDG_WARMUP', '').lower() not in ('', '0', 'false', 'no')
+
+_started = False
+_lock = threading.Lock()
+
+
+# Gráficos exibidos por cada página antes de qualquer interação do usuário
+def default_specs(dataset, renderer='matplotlib'):
+    ports = dataset.ports[:PORTS_PER_PAGE]
+    specs = []
+    if dataset.temas:
+        # View by SDG: primeiro tema, todas as áreas, primeira página de portos
+        df_slice, group = tema_slice(dataset, dataset.temas[0]), tema_group(dataset, dataset.temas[0])
+        if len(df_slice):
+            specs.append(sdg_grid_spec(df_slice, group, ports, renderer))
+            specs.extend(sdg_pair_spec(df_slice, group, porto, renderer) for porto in ports)
+    # SDG per Port: primeira página de portos
+    specs.append(port_overview_spec(dataset, ports, renderer))
+    # SDG and Average: primeiro porto, temas abertos por padrão
+    if dataset.ports:
+        for tema in dataset.temas[:TEMAS_INICIAIS]:
+            specs.extend(average_halves(tema_slice(dataset, tema), tema_group(dataset, tema), tema, dataset.ports[0],
+                                        renderer) or ())
+    return specs
+
+
+# Projeções de radar de todos os N usados pelas páginas (temas, áreas e médias por TEMA)
+def register_projections(dataset):
+    sizes = {len(dataset.temas)}
+    for tema in dataset.temas:
+        sizes.add(dataset.groups.group(tema).size)
+        sizes.update(dataset.groups.group(tema, area).size for area in dataset.groups.children(tema))
+    for size in sorted(sizes - {0}):
+        radar_factory(size, frame='polygon')
+    return sizes
+
+
+def warm_up(base_path=BASE_PATH, attributes_path=ATTRIBUTES_PATH, renderer='matplotlib'):
+    started = time.perf_counter()
+    with metrics.page("warmup"):
+        with metrics.span("load"):
+            dataset = load_dataset(base_path)
+            try:
+                load_attributes(attributes_path)
+            except (OSError, ValueError):
+                pass  # a página de atributos mostra o erro ao usuário
+        with metrics.span("projections"):
+            register_projections(dataset)
+        with metrics.span("statistics"):
+            tema_statistics(dataset)
+        specs = default_specs(dataset, renderer)
+        with metrics.span("charts"):
+            if specs:
+                # O primeiro gráfico é desenhado neste processo (importa o matplotlib e monta o
+                # cache de fontes); os demais vão para o pool
+                chart_cache.get_or_render(specs[0], render_chart)
+                render_many(specs[1:])
+    return len(specs), time.perf_counter() - started
+
+
+# Inicia o aquecimento em segundo plano, uma única vez por processo (por padrão só com
+# SDG_WARMUP=1; sdg/serve.py força o aquecimento ao subir o servidor)
+def start_warmup(enabled=None):
+    global _started
+    if not (ENABLED if enabled is None else enabled) or _started:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_warm_up_quietly, name='sdg-warmup', daemon=True).start()
+
+
+def _warm_up_quietly():
+    try:
+        warm_up()
+    except Exception:  # o aquecimento nunca pode derrubar o servidor
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sdg.warmup',
+                                     description='Preload the data and pre-render the default charts of every page.')
+    parser.add_argument('--data', default=BASE_PATH, help='BASE.csv file (default: %(default)s)')
+    parser.add_argument('--attributes', default=ATTRIBUTES_PATH, help='attributes workbook (default: %(default)s)')
+    parser.add_argument('--renderer', choices=['matplotlib', 'svg'], default='matplotlib')
+    args = parser.parse_args(argv)
+    # O pool de desenho sobe em paralelo com a leitura dos dados
+    start_pool()
+    count, seconds = warm_up(args.data, args.attributes, args.renderer)
+    print(f"{count} charts warmed up in {seconds:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
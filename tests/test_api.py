@@ -0,0 +1,25 @@
+import json
+
+from sdg.api import Api
+from sdg.stats import STATISTICS
+
+
+def get(api, target):
+    status, _, body = api.handle(target)
+    return status, json.loads(body)
+
+
+# Estatística fora da lista é um pedido inválido (400, com os valores aceitos); nomes que vêm
+# dos dados, como portos e temas, continuam 404
+def test_unknown_statistic_is_a_bad_request():
+    api = Api()
+    status, body = get(api, '/api/statistics?statistic=Mode')
+    assert status == 400
+    assert all(statistic in body['error'] for statistic in STATISTICS)
+    assert get(api, '/api/statistics?statistic=Median')[0] == 200
+
+
+def test_unknown_port_and_tema_are_not_found():
+    api = Api()
+    assert get(api, '/api/statistics?ports=Nowhere')[0] == 404
+    assert get(api, '/api/slice?tema=SDG%2099')[0] == 404
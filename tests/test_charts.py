@@ -0,0 +1,87 @@
+import threading
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+from sdg import charts  # noqa: E402
+from sdg.charts import make_panel, make_spec, release_figures, render_chart  # noqa: E402
+
+LABELS = [f"7.{item:02d}" for item in range(1, 9)]
+
+
+def pair_spec(port, values):
+    return make_spec('pair', LABELS, [make_panel(port, values), make_panel("Average", [1.5] * len(LABELS),
+                                                                           style='average')])
+
+
+def render_in_thread(spec):
+    images = []
+    thread = threading.Thread(target=lambda: images.append(render_chart(spec)))
+    thread.start()
+    thread.join()
+    return images[0]
+
+
+def idle_serials():
+    return [figure.serial for _, figure in charts._idle.values()]
+
+
+# Cada rerun do Streamlit roda em uma thread nova: a figura criada por uma thread precisa
+# ser reaproveitada pela seguinte, e o resultado não pode depender de quem desenhou antes
+def test_figures_are_reused_across_threads():
+    release_figures()
+    first = pair_spec("Port A", [0, 1, 2, 3, 2, 1, 0, 3])
+    second = pair_spec("Port B", [3, 3, 2, 2, 1, 1, 0, 0])
+    render_in_thread(first)
+    serials = idle_serials()
+    assert len(serials) == 1
+
+    image = render_in_thread(second)
+    assert idle_serials() == serials
+    release_figures()
+    assert image == render_chart(second)
+    release_figures()
+
+
+def test_concurrent_renders_use_separate_figures():
+    release_figures()
+    spec = pair_spec("Port A", [0, 1, 2, 3, 2, 1, 0, 3])
+    barrier = threading.Barrier(2)
+    images = []
+
+    def draw():
+        barrier.wait()
+        images.append(render_chart(spec))
+
+    threads = [threading.Thread(target=draw) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(images) == 2 and images[0] == images[1]
+    assert 1 <= len(idle_serials()) <= 2
+    release_figures()
+
+
+# O fundo rasterizado por uma thread serve à seguinte; o limite em bytes vale para o processo
+def test_backgrounds_are_shared_across_threads():
+    release_figures()
+    render_in_thread(pair_spec("Port A", [0, 1, 2, 3, 2, 1, 0, 3]))
+    keys = list(charts._backgrounds._entries)
+    assert len(keys) == 1
+    render_in_thread(pair_spec("Port B", [3, 3, 2, 2, 1, 1, 0, 0]))
+    assert list(charts._backgrounds._entries) == keys
+    release_figures()
+
+
+def test_background_cache_byte_limit(monkeypatch):
+    release_figures()
+    render_chart(pair_spec("Port A", [0, 1, 2, 3, 2, 1, 0, 3]))
+    one = charts._backgrounds.size
+    monkeypatch.setattr(charts, 'BACKGROUND_CACHE_MB', one * 1.5 / 2**20)
+    for size in (5, 6, 7):
+        labels = LABELS[:size]
+        render_chart(make_spec('pair', labels, [make_panel("Port A", [1] * size), make_panel("Port B", [2] * size)]))
+    assert len(charts._backgrounds) == 1 and charts._backgrounds.size <= one * 1.5
+    release_figures()
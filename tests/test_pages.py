@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# O AppTest roda em um processo próprio: BASE_PATH é lido na importação de sdg.data
+RUN_PAGE = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+from sdg import render
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+print(json.dumps({
+    'pool': render._executor is not None or render._starting is not None,
+    'exceptions': [element.value for element in at.exception],
+    'errors': [element.body for element in at.error],
+    'info': [element.body for element in at.info],
+    'sliders': [element.label for element in at.sidebar.slider],
+    'tables': len(at.dataframe),
+}))
+"""
+
+
+def run_page(page, base_path, workers=1):
+    env = dict(os.environ, SDG_BASE_PATH=str(base_path), SDG_CHART_CACHE_DIR='', SDG_RENDER_WORKERS=str(workers),
+               PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-c', RUN_PAGE, os.path.join(ROOT, page)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=600)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# BASE.csv com só os primeiros `count` portos
+def base_with_ports(tmp_path, count):
+    base = pd.read_csv(os.path.join(ROOT, 'BASE.csv'), sep=';')
+    ports = list(base.columns[6:6 + count])
+    path = tmp_path / 'BASE.csv'
+    base[list(base.columns[:6]) + ports].to_csv(path, sep=';', index=False)
+    return path
+
+
+def test_port_peers_with_two_ports(tmp_path):
+    page = run_page('pages/5_Port_Peers.py', base_with_ports(tmp_path, 2))
+    assert page['exceptions'] == [] and page['errors'] == []
+    assert "Peers per port" not in page['sliders']
+    assert page['tables'] >= 3  # vizinhos, clusters e rankings
+
+
+def test_port_peers_with_one_port(tmp_path):
+    page = run_page('pages/5_Port_Peers.py', base_with_ports(tmp_path, 1))
+    assert page['exceptions'] == [] and page['errors'] == []
+    assert page['info'] == ["At least two ports are needed to compare peers."]
+
+
+# O pool de desenho só sobe pelos pontos de entrada de linha de comando (sdg.serve), nunca
+# a partir de uma página: o 'spawn' troca o __main__ do processo enquanto inicia os processos
+def test_pages_never_start_the_render_pool(tmp_path):
+    page = run_page('pages/2_View_by_SDG.py', base_with_ports(tmp_path, 4), workers=2)
+    assert page['exceptions'] == [] and page['errors'] == []
+    assert page['pool'] is False
@@ -0,0 +1,45 @@
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from sdg.charts import make_panel, make_spec
+from sdg.svg import render_svg, render_svg_batch
+
+LABELS = [f"7.{item:02d}" for item in range(1, 9)]
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+# Números dos atributos de geometria; 'nan' e 'inf' também casam, para o teste acusá-los
+def coordinates(root):
+    return [float(number) for element in root.iter() for name in ('points', 'd', 'x', 'y', 'r')
+            for number in re.findall(r'-?(?:[\d.]+|nan|inf)', element.get(name, ''), re.IGNORECASE)]
+
+
+def grid(svg):
+    return re.findall(rb"<circle r='([\d.]+)'", svg) or re.findall(rb"<polygon points='([^']+)' fill='none'", svg)
+
+
+# Nota ausente (NaN) no porto: o SVG continua válido, sem 'nan' nos vértices, e a linha é
+# interrompida no item que falta
+def test_missing_score_breaks_the_line():
+    values = [1, 2, np.nan, 3, 2, 1, 0, 2]
+    svg = render_svg(make_spec('pair', LABELS, [make_panel("Port A", values),
+                                                make_panel("Average", [1.5] * len(LABELS), style='average')]))
+    root = ET.fromstring(svg)
+    assert np.isfinite(coordinates(root)).all()
+    series = [element for element in root.iter() if element.get('fill-opacity') is not None]
+    assert [element.tag for element in series] == [f'{SVG}path', f'{SVG}polygon']  # a média continua polígono
+    assert series[0].get('d').count('M') == 2
+
+
+# O limite radial ignora as ausências: a grade fica igual à do gráfico completo, e um porto
+# sem nenhuma nota ainda gera um SVG válido
+def test_missing_scores_keep_the_radial_limit():
+    complete = make_spec('single', LABELS, [make_panel("Port A", [1, 2, 0, 3, 2, 1, 0, 2])])
+    missing = make_spec('single', LABELS, [make_panel("Port A", [1, 2, np.nan, 3, 2, 1, 0, 2])])
+    empty = make_spec('single', LABELS, [make_panel("Port A", [np.nan] * len(LABELS))])
+    first, second, third = render_svg_batch([complete, missing, empty])
+    assert grid(second) == grid(first)
+    for svg in (second, third):
+        assert np.isfinite(coordinates(ET.fromstring(svg))).all()